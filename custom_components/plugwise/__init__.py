@@ -7,6 +7,7 @@ from homeassistant.core import HomeAssistant
 from .const import CONF_USB_PATH
 
 from .gateway import async_setup_entry_gw, async_unload_entry_gw
+from .storage import PlugwiseStore
 from .usb import async_setup_entry_usb, async_unload_entry_usb
 
 
@@ -26,3 +27,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if entry.data.get(CONF_USB_PATH):
         return await async_unload_entry_usb(hass, entry)
     return False
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached topology of a removed Smile."""
+    if entry.data.get(CONF_HOST):
+        await PlugwiseStore(hass, entry.entry_id).async_remove()
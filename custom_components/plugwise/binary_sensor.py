@@ -27,7 +27,6 @@ from .const import (
     DOMAIN,
     LOGGER,
     PW_TYPE,
-    SEVERITIES,
     SERVICE_USB_SCAN_CONFIG,
     SERVICE_USB_SCAN_CONFIG_SCHEMA,
     SERVICE_USB_SED_BATTERY_CONFIG,
@@ -37,8 +36,9 @@ from .const import (
     USB_MOTION_ID,
 )
 from .coordinator import PlugwiseDataUpdateCoordinator
-from .entity import PlugwiseEntity
+from .entity import PlugwiseEntity, async_add_planned_entities
 from .models import PW_BINARY_SENSOR_TYPES, PlugwiseBinarySensorEntityDescription
+from .plan import EntitySpec
 from .usb import PlugwiseUSBEntity
 
 PARALLEL_UPDATES = 0
@@ -106,25 +106,13 @@ async def async_setup_entry_gateway(hass, config_entry, async_add_entities):
     coordinator: PlugwiseDataUpdateCoordinator = hass.data[DOMAIN][
         config_entry.entry_id
     ][COORDINATOR]
-
-    entities: list[PlugwiseBinarySensorEntity] = []
-    for device_id, device in coordinator.data.devices.items():
-        for description in PW_BINARY_SENSOR_TYPES:
-            if (
-                "binary_sensors" not in device
-                or description.key not in device["binary_sensors"]
-            ):
-                continue
-
-            entities.append(
-                PlugwiseBinarySensorEntity(
-                    coordinator,
-                    device_id,
-                    description,
-                )
-            )
-            LOGGER.debug("Add %s binary sensor", description.key)
-    async_add_entities(entities)
+    async_add_planned_entities(
+        coordinator,
+        config_entry,
+        Platform.BINARY_SENSOR,
+        PlugwiseBinarySensorEntity,
+        async_add_entities,
+    )
 
 
 class PlugwiseBinarySensorEntity(PlugwiseEntity, BinarySensorEntity):
@@ -135,27 +123,20 @@ class PlugwiseBinarySensorEntity(PlugwiseEntity, BinarySensorEntity):
     def __init__(
         self,
         coordinator: PlugwiseDataUpdateCoordinator,
-        device_id: str,
-        description: PlugwiseBinarySensorEntityDescription,
+        spec: EntitySpec,
     ) -> None:
         """Initialise the binary_sensor."""
-        super().__init__(coordinator, device_id)
-        self.entity_description = description
+        super().__init__(coordinator, spec.device_id)
+        self.entity_description = spec.description
         self._attr_entity_registry_enabled_default = (
-            description.entity_registry_enabled_default
+            spec.description.entity_registry_enabled_default
         )
-        self._attr_unique_id = f"{device_id}-{description.key}"
-        self._attr_name = (f"{self.device.get('name', '')} {description.name}").lstrip()
+        self._attr_unique_id = spec.unique_id
+        self._attr_name = spec.name
 
     @property
     def is_on(self) -> bool | None:
         """Return true if the binary sensor is on."""
-        if notify := self.coordinator.data.gateway.get("notifications"):
-            for notify_id, message in notify.items():
-                self.hass.components.persistent_notification.async_create(
-                    message, "Plugwise Notification:", f"{DOMAIN}.{notify_id}"
-                )
-
         return self.device["binary_sensors"].get(self.entity_description.key)
 
     @property
@@ -171,16 +152,7 @@ class PlugwiseBinarySensorEntity(PlugwiseEntity, BinarySensorEntity):
         if self.entity_description.key != "plugwise_notification":
             return None
 
-        attrs: dict[str, list[str]] = {f"{severity}_msg": [] for severity in SEVERITIES}
-        if notify := self.coordinator.data.gateway.get("notifications"):
-            for details in notify.values():
-                for msg_type, msg in details.items():
-                    msg_type = msg_type.lower()
-                    if msg_type not in SEVERITIES:
-                        msg_type = "other"
-                    attrs[f"{msg_type}_msg"].append(msg)
-
-        return attrs
+        return self.coordinator.notification_attrs
 
 
 class USBBinarySensor(PlugwiseUSBEntity, BinarySensorEntity):
@@ -0,0 +1,57 @@
+"""Circuit breaker for the requests to a Plugwise gateway."""
+from __future__ import annotations
+
+from datetime import timedelta
+import random
+from time import monotonic
+
+from .const import (
+    BACKOFF_JITTER,
+    BREAKER_FAILURES,
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+)
+
+
+class CircuitBreaker:
+    """Back off exponentially from a failing gateway.
+
+    After BREAKER_FAILURES consecutive failures the circuit opens and no
+    request is sent until the backoff delay passed. Then one probe is
+    allowed (half open), its failure opens the circuit again.
+    """
+
+    def __init__(self, min_interval: timedelta, max_interval: timedelta) -> None:
+        """Initialize the breaker."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self._retry_at = 0.0
+
+    def allow_request(self) -> bool:
+        """Return if a request may be sent, half opening an open circuit."""
+        if self.state == CIRCUIT_OPEN:
+            # Scheduled refreshes are floored to the second, allow for that
+            if monotonic() < self._retry_at - 1:
+                return False
+            self.state = CIRCUIT_HALF_OPEN
+        return True
+
+    def record_failure(self) -> timedelta:
+        """Record a failed request, return the delay until the next one."""
+        self.failures += 1
+        delay = min(
+            self.min_interval * 2 ** (self.failures - 1),
+            self.max_interval,
+        ) * random.uniform(1, 1 + BACKOFF_JITTER)
+        if self.state == CIRCUIT_HALF_OPEN or self.failures >= BREAKER_FAILURES:
+            self.state = CIRCUIT_OPEN
+            self._retry_at = monotonic() + delay.total_seconds()
+        return delay
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit."""
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
@@ -17,7 +17,7 @@ from homeassistant.components.climate.const import (
     SUPPORT_TARGET_TEMPERATURE,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_TEMPERATURE, TEMP_CELSIUS
+from homeassistant.const import ATTR_TEMPERATURE, TEMP_CELSIUS, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import (
@@ -25,10 +25,10 @@ from .const import (
     DEFAULT_MAX_TEMP,
     DEFAULT_MIN_TEMP,
     DOMAIN,
-    MASTER_THERMOSTATS,
 )
 from .coordinator import PlugwiseDataUpdateCoordinator
-from .entity import PlugwiseEntity
+from .entity import PlugwiseEntity, async_add_planned_entities
+from .plan import EntitySpec
 from .util import plugwise_command
 
 
@@ -39,10 +39,12 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Smile Thermostats from a config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
-    async_add_entities(
-        PlugwiseClimateEntity(coordinator, device_id)
-        for device_id, device in coordinator.data.devices.items()
-        if device["class"] in MASTER_THERMOSTATS
+    async_add_planned_entities(
+        coordinator,
+        config_entry,
+        Platform.CLIMATE,
+        PlugwiseClimateEntity,
+        async_add_entities,
     )
 
 
@@ -54,13 +56,17 @@ class PlugwiseClimateEntity(PlugwiseEntity, ClimateEntity):
     def __init__(
         self,
         coordinator: PlugwiseDataUpdateCoordinator,
-        device_id: str,
+        spec: EntitySpec,
     ) -> None:
         """Set up the Plugwise API."""
-        super().__init__(coordinator, device_id)
+        super().__init__(coordinator, spec.device_id)
         self._attr_extra_state_attributes = {}
-        self._attr_unique_id = f"{device_id}-climate"
-        self._attr_name = self.device.get("name")
+        self._attr_unique_id = spec.unique_id
+        self._attr_name = spec.name
+        # hvac_action falls back to the state of the heater device
+        self._heater_id = self.coordinator.data.gateway.get("heater_id")
+        if self._heater_id:
+            self._listen_device_ids.add(self._heater_id)
 
         # Determine preset modes
         self._attr_supported_features = SUPPORT_TARGET_TEMPERATURE
@@ -101,20 +107,18 @@ class PlugwiseClimateEntity(PlugwiseEntity, ClimateEntity):
     @property
     def hvac_action(self) -> str:
         """Return the current running hvac operation if supported."""
+        device = self.device
         # When control_state is present, prefer this data
-        if "control_state" in self.device:
-            if self.device.get("control_state") == "cooling":
+        if "control_state" in device:
+            if (control_state := device["control_state"]) == "cooling":
                 return CURRENT_HVAC_COOL
             # Support preheating state as heating, until preheating is added as a separate state
-            if self.device.get("control_state") in ["heating", "preheating"]:
+            if control_state in ["heating", "preheating"]:
                 return CURRENT_HVAC_HEAT
-        else:
-            heater_central_data = self.coordinator.data.devices[
-                self.coordinator.data.gateway["heater_id"]
-            ]
-            if heater_central_data["binary_sensors"].get("heating_state"):
+        elif heater := self.coordinator.data.devices.get(self._heater_id):
+            if heater["binary_sensors"].get("heating_state"):
                 return CURRENT_HVAC_HEAT
-            if heater_central_data["binary_sensors"].get("cooling_state"):
+            if heater["binary_sensors"].get("cooling_state"):
                 return CURRENT_HVAC_COOL
         return CURRENT_HVAC_IDLE
 
@@ -138,7 +142,16 @@ class PlugwiseClimateEntity(PlugwiseEntity, ClimateEntity):
             self._attr_max_temp < temperature < self._attr_min_temp
         ):
             raise ValueError("Invalid temperature requested")
-        await self.coordinator.api.set_temperature(self.device["location"], temperature)
+        location = self.device["location"]
+        with self.coordinator.optimistic_command(
+            self._dev_id, {"sensors": {"setpoint": temperature}}
+        ):
+            await self.coordinator.coalescer.async_submit(
+                ("setpoint", location),
+                lambda: self.coordinator.async_send_command(
+                    self.coordinator.api.set_temperature, location, temperature
+                ),
+            )
 
     @plugwise_command
     async def async_set_hvac_mode(self, hvac_mode: str) -> None:
@@ -146,7 +159,8 @@ class PlugwiseClimateEntity(PlugwiseEntity, ClimateEntity):
         if hvac_mode == HVAC_MODE_AUTO and not self.device.get("schedule_temperature"):
             raise ValueError("Cannot set HVAC mode to Auto: No schedule available")
 
-        await self.coordinator.api.set_schedule_state(
+        await self.coordinator.async_send_command(
+            self.coordinator.api.set_schedule_state,
             self.device["location"],
             self.device.get("last_used"),
             "on" if hvac_mode == HVAC_MODE_AUTO else "off",
@@ -155,4 +169,13 @@ class PlugwiseClimateEntity(PlugwiseEntity, ClimateEntity):
     @plugwise_command
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set the preset mode."""
-        await self.coordinator.api.set_preset(self.device["location"], preset_mode)
+        location = self.device["location"]
+        with self.coordinator.optimistic_command(
+            self._dev_id, {"active_preset": preset_mode}
+        ):
+            await self.coordinator.coalescer.async_submit(
+                ("preset", location),
+                lambda: self.coordinator.async_send_command(
+                    self.coordinator.api.set_preset, location, preset_mode
+                ),
+            )
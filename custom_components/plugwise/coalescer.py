@@ -0,0 +1,83 @@
+"""Command coalescing for the Plugwise integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import COALESCE_WINDOW, LOGGER
+
+
+class _Batch:
+    """Requests for the same target within one window."""
+
+    def __init__(self, future: asyncio.Future[Any], timer: asyncio.TimerHandle) -> None:
+        """Initialize the batch."""
+        self.future = future
+        self.timer = timer
+        self.job: Callable[[], Awaitable[Any]] | None = None
+        self.requests = 0
+
+
+class CommandCoalescer:
+    """Send only the last of the commands for a target within a short window.
+
+    Targets are keys like ("setpoint", location). Every caller of a window
+    awaits the result of the one command that is sent.
+    """
+
+    def __init__(self, hass: HomeAssistant, window: float = COALESCE_WINDOW) -> None:
+        """Initialize the coalescer."""
+        self.hass = hass
+        self.window = window
+        self._batches: dict[Hashable, _Batch] = {}
+        self._sending: set[asyncio.Task[None]] = set()
+
+    async def async_submit(
+        self, key: Hashable, job: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Queue job for key, replacing a job queued earlier in this window."""
+        if (batch := self._batches.get(key)) is None:
+            batch = self._batches[key] = _Batch(
+                self.hass.loop.create_future(),
+                self.hass.loop.call_later(self.window, self._async_send, key),
+            )
+        batch.job = job
+        batch.requests += 1
+        return await asyncio.shield(batch.future)
+
+    @callback
+    def _async_send(self, key: Hashable) -> None:
+        """Send the last job of the window for key."""
+        batch = self._batches.pop(key)
+        if batch.requests > 1:
+            LOGGER.debug("Coalesced %s requests for %s", batch.requests, key)
+        task = self.hass.async_create_task(self._async_run(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the queued and running batches, e.g. when unloading."""
+        for batch in self._batches.values():
+            batch.timer.cancel()
+            batch.future.cancel()
+        self._batches.clear()
+        for task in self._sending:
+            task.cancel()
+
+    @staticmethod
+    async def _async_run(batch: _Batch) -> None:
+        """Run the job and hand its outcome to every caller."""
+        assert batch.job is not None
+        try:
+            result = await batch.job()
+        except asyncio.CancelledError:
+            batch.future.cancel()
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            batch.future.set_exception(err)
+        else:
+            batch.future.set_result(result)
@@ -36,9 +36,13 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .const import (
     API,
     COORDINATOR,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_STALE_TTL,
     CONF_USB_PATH,
     DEFAULT_PORT,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_TTL,
     DEFAULT_USERNAME,
     DOMAIN,
     FLOW_NET,
@@ -47,6 +51,7 @@ from .const import (
     FLOW_TYPE,
     FLOW_USB,
     LOGGER,
+    MIN_SCAN_INTERVAL,
     PW_TYPE,
     SMILE,
     STICK,
@@ -54,6 +59,7 @@ from .const import (
     STRETCH_USERNAME,
     ZEROCONF_MAP,
 )
+from .handoff import async_offer_api, gateway_handoff_key, usb_handoff_key
 
 
 CONF_MANUAL_PATH = "Enter Manually"
@@ -86,7 +92,6 @@ async def validate_usb_connection(self, device_path=None) -> dict[str, str]:
     try:
         await self.async_add_executor_job(api_stick.connect)
         await self.async_add_executor_job(api_stick.initialize_stick)
-        await self.async_add_executor_job(api_stick.disconnect)
     except PortError:
         errors[CONF_BASE] = "cannot_connect"
     except StickInitError:
@@ -95,6 +100,14 @@ async def validate_usb_connection(self, device_path=None) -> dict[str, str]:
         errors[CONF_BASE] = "network_down"
     except TimeoutException:
         errors[CONF_BASE] = "network_timeout"
+    if not errors:
+        # Entry setup adopts the initialized stick, or it is disconnected
+        async_offer_api(
+            self,
+            usb_handoff_key(device_path),
+            api_stick,
+            lambda stick: self.async_add_executor_job(stick.disconnect),
+        )
     return errors, api_stick
 
 
@@ -261,6 +274,7 @@ class PlugwiseConfigFlow(ConfigFlow, domain=DOMAIN):
                 self._abort_if_unique_id_configured()
 
                 user_input[PW_TYPE] = API
+                async_offer_api(self.hass, gateway_handoff_key(user_input), api)
                 return self.async_create_entry(title=api.smile_name, data=user_input)
 
         return self.async_show_form(
@@ -312,17 +326,43 @@ class PlugwiseOptionsFlowHandler(config_entries.OptionsFlow):
         if not self.config_entry.data.get(CONF_HOST):
             return await self.async_step_none(user_input)
 
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            scan_interval = user_input[CONF_SCAN_INTERVAL]
+            min_interval = user_input[CONF_MIN_SCAN_INTERVAL]
+            max_interval = user_input[CONF_MAX_SCAN_INTERVAL]
+            if min_interval > max_interval:
+                errors["base"] = "min_above_max"
+            elif not min_interval <= scan_interval <= max_interval:
+                errors["base"] = "scan_interval_out_of_bounds"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         coordinator = self.hass.data[DOMAIN][self.config_entry.entry_id][COORDINATOR]
-        interval = DEFAULT_SCAN_INTERVAL[coordinator.api.smile_type]
+        smile_type = coordinator.api.smile_type
+        options = {**self.config_entry.options, **(user_input or {})}
+        scan_interval = options.get(
+            CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL[smile_type]
+        )
+        interval = vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL))
 
+        # Without bounds the scan interval is fixed, as it was before
         data = {
+            vol.Optional(CONF_SCAN_INTERVAL, default=scan_interval): interval,
             vol.Optional(
-                CONF_SCAN_INTERVAL,
-                default=self.config_entry.options.get(CONF_SCAN_INTERVAL, interval),
-            ): int
+                CONF_MIN_SCAN_INTERVAL,
+                default=options.get(CONF_MIN_SCAN_INTERVAL, scan_interval),
+            ): interval,
+            vol.Optional(
+                CONF_MAX_SCAN_INTERVAL,
+                default=options.get(CONF_MAX_SCAN_INTERVAL, scan_interval),
+            ): interval,
+            vol.Optional(
+                CONF_STALE_TTL,
+                default=options.get(CONF_STALE_TTL, DEFAULT_STALE_TTL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
         }
 
-        return self.async_show_form(step_id="init", data_schema=vol.Schema(data))
+        return self.async_show_form(
+            step_id="init", data_schema=vol.Schema(data), errors=errors
+        )
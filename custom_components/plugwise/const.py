@@ -37,6 +37,11 @@ FLOW_USB = "USB: Stick"
 
 UNDO_UPDATE_LISTENER = "undo_update_listener"
 
+# Options
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_STALE_TTL = "stale_ttl"
+
 # Default directives
 DEFAULT_MAX_TEMP = 30
 DEFAULT_MIN_TEMP = 4
@@ -46,9 +51,95 @@ DEFAULT_SCAN_INTERVAL = {
     "stretch": 60,
     "thermostat": 60,
 }
+# Lowest scan interval option, the adaptive interval is bounded by the
+# min/max options and fixed at the scan interval without them.
+MIN_SCAN_INTERVAL = 5
+# Seconds to wait before refreshing after a command, gives the device time
+# to process the change in state before we query it.
+REFRESH_COOLDOWN = 1.5
+# Factor by which the gap between re-polls grows while a command has not
+# been reported as applied yet, up to OPTIMISTIC_TIMEOUT.
+CONVERGENCE_BACKOFF = 2
+
+# Seconds to collect setpoint and preset requests for a zone, only the last
+# one is sent to the gateway.
+COALESCE_WINDOW = 0.5
+
+# Seconds to show the expected result of a command before giving up on
+# the gateway reporting it.
+OPTIMISTIC_TIMEOUT = 30
+
+# Failure backoff: jitter fraction and failures before the circuit opens
+BACKOFF_JITTER = 0.1
+# Seconds, ceiling of the failure backoff unless the max scan interval is higher
+BACKOFF_MAX = 300
+BREAKER_FAILURES = 3
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_OPEN = "open"
+DEFAULT_STALE_TTL = 0  # Seconds to serve the last good data after failures
 DEFAULT_TIMEOUT = 10
+HANDOFF_TTL = 60  # Seconds a config flow connection waits for the entry setup
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 300  # Seconds between writes of the last known data
+# Seconds building the device topology may take before setup warns
+TOPOLOGY_BUDGET = 2
+# Topology rebuilds a device or entity must be missing from before it is
+# removed from the registries, with its customisations
+TOPOLOGY_CONFIRMATIONS = 2
 DEFAULT_USERNAME = "smile"
 
+# Adaptive polling: consecutive polls with (or without) changes before the
+# scan interval is shortened (or stretched), and the step factors used.
+ADAPTIVE_POLLS = 2
+ADAPTIVE_SPEEDUP = 0.5
+ADAPTIVE_SLOWDOWN = 1.5
+
+# Slow moving device metadata, only compared and copied every
+# METADATA_REFRESH_POLLS polls or after a command, carried forward otherwise.
+METADATA_KEYS = (
+    "available_schedules",
+    "class",
+    "fw",
+    "hw",
+    "location",
+    "lower_bound",
+    "mac_address",
+    "members",
+    "model",
+    "name",
+    "preset_modes",
+    "presets",
+    "resolution",
+    "types",
+    "upper_bound",
+    "vendor",
+    "zigbee_mac_address",
+)
+METADATA_REFRESH_POLLS = 10
+# Metadata shown in the device registry
+DEVICE_INFO_KEYS = (
+    "fw",
+    "hw",
+    "mac_address",
+    "model",
+    "name",
+    "vendor",
+    "zigbee_mac_address",
+)
+
+# Timed phases of a coordinator update and the number of samples kept.
+# The plugwise library does not separate the HTTP request from the XML
+# parsing, the fetch phase covers both.
+UPDATE_PHASES = ("fetch", "snapshot", "dispatch", "state_writes")
+ROLLING_SAMPLES = 100
+
+# Request lanes to a gateway, in order of priority: user commands run
+# before queued polls.
+LANE_COMMAND = "command"
+LANE_POLL = "poll"
+REQUEST_LANES = (LANE_COMMAND, LANE_POLL)
+
 # --- Const for Plugwise Smile and Stretch
 PLATFORMS_GATEWAY = [
     Platform.BINARY_SENSOR,
@@ -58,6 +149,11 @@ PLATFORMS_GATEWAY = [
 ]
 SENSOR_PLATFORMS = [Platform.SENSOR, Platform.SWITCH]
 SERVICE_DELETE = "delete_notification"
+# Batch switch service: seconds between writes to the same gateway, a
+# Stretch drops requests that follow each other too closely.
+EVENT_SWITCHES_RESULT = f"{DOMAIN}_set_switches_result"
+SERVICE_SET_SWITCHES = "set_switches"
+SWITCH_WRITE_INTERVAL = 0.25
 SEVERITIES = ["other", "info", "warning", "error"]
 
 # Climate const:
@@ -67,6 +163,10 @@ MASTER_THERMOSTATS = [
     "zone_thermostat",
     "thermostatic_radiator_valve",
 ]
+# Bulk zone service
+ATTR_LOCATIONS = "locations"
+EVENT_ZONES_RESULT = f"{DOMAIN}_set_zones_result"
+SERVICE_SET_ZONES = "set_zones"
 
 # Config_flow const:
 ZEROCONF_MAP = {
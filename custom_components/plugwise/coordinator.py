@@ -1,14 +1,63 @@
 """DataUpdateCoordinator for Plugwise."""
-from typing import Any, NamedTuple
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from copy import deepcopy
+from datetime import timedelta
+from time import monotonic, perf_counter
+from typing import Any, NamedTuple, TypeVar
 
 from plugwise import Smile
-from plugwise.exceptions import PlugwiseException, XMLDataMissingError
+from plugwise.exceptions import (
+    InvalidAuthentication,
+    PlugwiseException,
+    XMLDataMissingError,
+)
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.debounce import Debouncer
+from homeassistant.const import ATTR_NAME, ATTR_VIA_DEVICE, CONF_HOST, Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, LOGGER
+from .const import (
+    ADAPTIVE_POLLS,
+    ADAPTIVE_SLOWDOWN,
+    ADAPTIVE_SPEEDUP,
+    BACKOFF_MAX,
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    COORDINATOR,
+    DEVICE_INFO_KEYS,
+    DOMAIN,
+    LANE_COMMAND,
+    LANE_POLL,
+    LOGGER,
+    METADATA_KEYS,
+    METADATA_REFRESH_POLLS,
+    REFRESH_COOLDOWN,
+    SEVERITIES,
+    TOPOLOGY_BUDGET,
+    TOPOLOGY_CONFIRMATIONS,
+    UPDATE_PHASES,
+)
+from .breaker import CircuitBreaker
+from .coalescer import CommandCoalescer
+from .metrics import RollingTimer
+from .optimistic import OptimisticCommands, PendingCommand
+from .plan import (
+    EntityPlan,
+    TopologyChange,
+    build_entity_plan,
+    entity_reported,
+    topology_change,
+)
+from .scheduler import RequestScheduler
+
+_K = TypeVar("_K")
+_T = TypeVar("_T")
 
 
 class PlugwiseData(NamedTuple):
@@ -18,32 +67,628 @@ class PlugwiseData(NamedTuple):
     devices: dict[str, dict[str, Any]]
 
 
+def _live_values_equal(
+    device: dict[str, Any],
+    live: dict[str, Any],
+    unused: dict[str, set[str]] | None,
+) -> bool:
+    """Return if the device has the live values, ignoring unused group keys."""
+    # A live key the gateway stopped reporting is a change as well
+    if device.keys() - METADATA_KEYS != live.keys():
+        return False
+    for key, value in live.items():
+        if (old_value := device.get(key)) == value:
+            continue
+        if (
+            not unused
+            or not (skipped := unused.get(key))
+            or not isinstance(value, dict)
+            or not isinstance(old_value, dict)
+            or old_value.keys() != value.keys()
+            or any(
+                old_value[sub_key] != sub_value
+                for sub_key, sub_value in value.items()
+                if sub_key not in skipped
+            )
+        ):
+            return False
+    return True
+
+
+async def async_connect_smile(
+    hass: HomeAssistant, api: Smile, connected: bool = False
+) -> bool:
+    """Connect to the Smile at setup, unless connected, and build its topology."""
+    if not connected and not await api.connect():
+        return False
+
+    # Walking the XML of a large Adam takes a while, keep it off the loop
+    start = perf_counter()
+    await hass.async_add_executor_job(api.get_all_devices)
+    if (duration := perf_counter() - start) > TOPOLOGY_BUDGET:
+        LOGGER.warning(
+            "Building the device topology of %s took %.1f seconds",
+            api.smile_name,
+            duration,
+        )
+    else:
+        LOGGER.debug("Device topology of %s built in %.3f s", api.smile_name, duration)
+    return True
+
+
+def _confirm_missing(missing: dict[_K, int]) -> set[_K]:
+    """Count a rebuild for the missing items, return and forget the confirmed."""
+    confirmed = set()
+    for item in list(missing):
+        missing[item] += 1
+        if missing[item] >= TOPOLOGY_CONFIRMATIONS:
+            del missing[item]
+            confirmed.add(item)
+    return confirmed
+
+
 class PlugwiseDataUpdateCoordinator(DataUpdateCoordinator[PlugwiseData]):
     """Class to manage fetching Plugwise data from single endpoint."""
 
-    def __init__(self, hass: HomeAssistant, api: Smile, interval: float) -> None:
-        """Initialize the coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: Smile,
+        interval: timedelta,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        stale_ttl: timedelta = timedelta(0),
+        connected: bool = True,
+        api_factory: Callable[[], Smile] | None = None,
+    ) -> None:
+        """Initialize the coordinator.
+
+        When set up from the cached topology, the coordinator connects to
+        the Smile before its first poll. With api_factory, the topology is
+        rebuilt from a new connection every METADATA_REFRESH_POLLS polls.
+        """
         super().__init__(
             hass,
             LOGGER,
             name=api.smile_name or DOMAIN,
             update_interval=interval,
-            # Don't refresh immediately, give the device time to process
-            # the change in state before we query it.
-            request_refresh_debouncer=Debouncer(
-                hass,
-                LOGGER,
-                cooldown=1.5,
-                immediate=False,
-            ),
         )
         self.api = api
+        self.connected = connected
+        self._api_factory = api_factory
+        self.coalescer = CommandCoalescer(hass)
+        self.scheduler = RequestScheduler()
+        # Single-flight: the fetch in flight and the pending follow-up refresh
+        self._fetch_task: asyncio.Task[PlugwiseData] | None = None
+        self._fetch_started = 0.0
+        self._follow_up: asyncio.Task[None] | None = None
+        # Follow-up refreshes still running, the latest may run past its cooldown
+        self._follow_ups: set[asyncio.Task[None]] = set()
+        self._shut_down = False
+        self._follow_up_requested = 0.0
+        # Follow-up and convergence refreshes do not adapt the update interval
+        self._forced_refresh = False
+        self._fetch_forced = False
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # Serve the last good data for up to stale_ttl when polling fails
+        self.stale_ttl = stale_ttl
+        self.stale = False
+        self._last_good_update: float | None = None
+        # Showing the cached data restored at startup, see async_restore
+        self.restored = False
+        # Exponential backoff and circuit breaker on consecutive failures
+        self.breaker = CircuitBreaker(
+            min_interval, max(max_interval, timedelta(seconds=BACKOFF_MAX))
+        )
+        self._interval_before_failure: timedelta | None = None
+        # Positive: consecutive polls with changes, negative: without changes
+        self._adaptive_streak = 0
+        self._metadata_polls_left = 0
+        self._notification_ids: set[str] = set()
+        # Notification messages per severity, see PlugwiseBinarySensorEntity
+        self.notification_attrs: dict[str, list[str]] = {
+            f"{severity}_msg": [] for severity in SEVERITIES
+        }
+        # None means every device must be considered changed, e.g. on the
+        # first refresh when there is no previous snapshot to compare with.
+        self.changed_devices: set[str] | None = None
+        self._device_listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self._unsub_device_dispatch: CALLBACK_TYPE | None = None
+        self._dispatched_success = True
+        # Entity state writes, see PlugwiseEntity._handle_coordinator_update
+        self.state_writes = {"emitted": 0, "suppressed": 0}
+        self.state_write_time = 0.0
+        # Durations of the phases of an update
+        self.timers = {phase: RollingTimer() for phase in UPDATE_PHASES}
+        # Seconds from the start of setup, see async_setup_entry_gw
+        self.setup_timings: dict[str, float] = {}
+        self.optimistic = OptimisticCommands(hass)
+        self._entity_plan: EntityPlan | None = None
+        self._topology_change: TopologyChange | None = None
+        # A connected Smile only updates the devices it found when connecting
+        self._topology_polls_left = METADATA_REFRESH_POLLS
+        self._topology_rebuilt = False
+        # Rebuilds the devices and entities that left were missing from
+        self._missing_devices: dict[str, int] = {}
+        self._missing_entities: dict[tuple[Platform, str], int] = {}
+        self._topology_listeners: list[Callable[[TopologyChange], None]] = []
+        self._unsub_topology: CALLBACK_TYPE | None = None
+        # Device info shared by the entities of a device, with its metadata
+        self._device_info: dict[str, tuple[tuple[Any, ...], DeviceInfo]] = {}
+
+    async def async_send_command(
+        self, command: Callable[..., Awaitable[_T]], *args: Any
+    ) -> _T:
+        """Send a command to the gateway ahead of queued polls."""
+        return await self.scheduler.async_run(LANE_COMMAND, command, *args)
+
+    @callback
+    def async_add_device_listener(
+        self, device_id: str, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for data updates of a single device."""
+        if self._unsub_device_dispatch is None:
+            self._unsub_device_dispatch = self.async_add_listener(
+                self._async_dispatch_device_updates
+            )
+        self._device_listeners.setdefault(device_id, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove device update listener."""
+            listeners = self._device_listeners[device_id]
+            listeners.remove(update_callback)
+            if not listeners:
+                del self._device_listeners[device_id]
+            if not self._device_listeners and self._unsub_device_dispatch:
+                self._unsub_device_dispatch()
+                self._unsub_device_dispatch = None
+
+        return remove_listener
+
+    @callback
+    def async_add_topology_listener(
+        self, update_callback: Callable[[TopologyChange], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for devices and entities that join or leave the gateway."""
+        if self._unsub_topology is None:
+            self._unsub_topology = self.async_add_listener(
+                self._async_handle_topology_change
+            )
+        self._topology_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove topology listener."""
+            self._topology_listeners.remove(update_callback)
+            if not self._topology_listeners and self._unsub_topology:
+                self._unsub_topology()
+                self._unsub_topology = None
+
+        return remove_listener
+
+    @callback
+    def _async_handle_topology_change(self) -> None:
+        """Remove what left the gateway, let the platforms add what joined."""
+        if (topology := self._topology_change) is None:
+            return
+        self._topology_change = None
+        if any(topology):
+            LOGGER.info(
+                "Topology of %s changed, %s device(s) and %s entities removed",
+                self.name,
+                len(topology.removed_devices),
+                len(topology.removed_entities),
+            )
+        entity_registry = er.async_get(self.hass)
+        for platform, unique_id in topology.removed_entities:
+            if entity_id := entity_registry.async_get_entity_id(
+                platform, DOMAIN, unique_id
+            ):
+                entity_registry.async_remove(entity_id)
+
+        device_registry = dr.async_get(self.hass)
+        for device_id in topology.removed_devices:
+            self._device_info.pop(device_id, None)
+            # Removes the entities of the device as well
+            if self.config_entry and (
+                device := device_registry.async_get_device({(DOMAIN, device_id)})
+            ):
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=self.config_entry.entry_id
+                )
+
+        for update_callback in list(self._topology_listeners):
+            update_callback(topology)
+
+    @callback
+    def async_update_device_listeners(self, device_ids: set[str] | None) -> None:
+        """Call the listeners of the given devices, or of all devices for None."""
+        if device_ids is None:
+            device_ids = set(self._device_listeners)
+        for device_id in device_ids:
+            for update_callback in list(self._device_listeners.get(device_id, ())):
+                update_callback()
+
+    @callback
+    def async_device_info(self, device_id: str) -> DeviceInfo:
+        """Return the device info of a device, shared by all its entities.
+
+        It is only rebuilt when the metadata of the device changed.
+        """
+        device = self.data.devices[device_id]
+        gateway_id = self.data.gateway["gateway_id"]
+        smile_name = self.data.gateway["smile_name"]
+        metadata = (smile_name, *(device.get(key) for key in DEVICE_INFO_KEYS))
+        if (cached := self._device_info.get(device_id)) and cached[0] == metadata:
+            return cached[1]
+
+        configuration_url: str | None = None
+        if entry := self.config_entry:
+            configuration_url = f"http://{entry.data[CONF_HOST]}"
+
+        connections = set()
+        if mac := device.get("mac_address"):
+            connections.add((dr.CONNECTION_NETWORK_MAC, mac))
+        if mac := device.get("zigbee_mac_address"):
+            connections.add((dr.CONNECTION_ZIGBEE, mac))
+
+        device_info = DeviceInfo(
+            configuration_url=configuration_url,
+            identifiers={(DOMAIN, device_id)},
+            connections=connections,
+            manufacturer=device.get("vendor"),
+            model=device.get("model"),
+            name=f"Smile {smile_name}",
+            sw_version=device.get("fw"),
+            hw_version=device.get("hw"),
+        )
+        if device_id != gateway_id:
+            device_info.update(
+                {
+                    ATTR_NAME: device.get("name"),
+                    ATTR_VIA_DEVICE: (DOMAIN, str(gateway_id)),
+                }
+            )
+
+        self._device_info[device_id] = (metadata, device_info)
+        return device_info
+
+    @callback
+    def _async_update_device_registry(self, device_ids: set[str] | None) -> None:
+        """Write changed metadata of devices with entities to the registry."""
+        if device_ids is None:
+            device_ids = set(self._device_info)
+        registry = dr.async_get(self.hass)
+        for device_id in device_ids & self._device_info.keys():
+            if device_id not in self.data.devices:
+                continue
+            previous = self._device_info[device_id][1]
+            if (device_info := self.async_device_info(device_id)) is previous:
+                continue
+            if device := registry.async_get_device({(DOMAIN, device_id)}):
+                LOGGER.debug("Metadata of device %s changed", device_id)
+                registry.async_update_device(
+                    device.id,
+                    manufacturer=device_info.get("manufacturer"),
+                    model=device_info.get("model"),
+                    name=device_info.get("name"),
+                    sw_version=device_info.get("sw_version"),
+                    hw_version=device_info.get("hw_version"),
+                )
+
+    @callback
+    def async_set_optimistic(
+        self, device_id: str, values: dict[str, Any]
+    ) -> PendingCommand | None:
+        """Show the expected result of a command until the gateway reports it.
+
+        Return the pending command, to roll back when sending it fails.
+        """
+        if self.data is None or (device := self.data.devices.get(device_id)) is None:
+            return None
+        command, self.data.devices[device_id] = self.optimistic.async_add(
+            device_id, device, values
+        )
+        self.async_update_device_listeners({device_id})
+        return command
+
+    @callback
+    def async_rollback_optimistic(
+        self, device_id: str, command: PendingCommand | None
+    ) -> None:
+        """Restore the values from before a failed command."""
+        if self.data is None or command is None:
+            return
+        device = self.optimistic.async_rollback(
+            device_id, self.data.devices.get(device_id), command
+        )
+        if device is not None:
+            self.data.devices[device_id] = device
+            self.async_update_device_listeners({device_id})
+
+    @contextmanager
+    def optimistic_command(
+        self, device_id: str, values: dict[str, Any]
+    ) -> Iterator[None]:
+        """Show the values while sending a command, roll them back if it fails.
+
+        Only the command of the caller is rolled back, once. A command that
+        a later one superseded, e.g. when coalesced, has nothing to restore.
+        """
+        command = self.async_set_optimistic(device_id, values)
+        try:
+            yield
+        except PlugwiseException:
+            self.async_rollback_optimistic(device_id, command)
+            raise
+
+    @callback
+    def async_restore(self, data: PlugwiseData) -> None:
+        """Show the cached data until the first live update."""
+        self.data = data
+        self.restored = True
+        # The first live update only compares notifications when they changed
+        self._async_update_notifications(data.gateway.get("notifications", {}))
+
+    @callback
+    def async_request_metadata_refresh(self) -> None:
+        """Compare the device metadata on the next poll, e.g. after a command."""
+        self._metadata_polls_left = 0
+
+    @callback
+    def async_request_topology_refresh(self) -> None:
+        """Rebuild the device topology on the next poll."""
+        self._topology_polls_left = 0
+
+    @callback
+    def _async_topology_rebuilt(self) -> None:
+        """Count a topology rebuild, new devices are compared in full."""
+        self._topology_polls_left = METADATA_REFRESH_POLLS
+        self._topology_rebuilt = True
+        self.async_request_metadata_refresh()
+
+    @callback
+    def _async_dispatch_device_updates(self) -> None:
+        """Wake only the entities of devices that changed since the last update."""
+        changed = self.changed_devices
+        if self.last_update_success != self._dispatched_success:
+            # Availability flipped, every entity has to write its state.
+            changed = None
+        elif not self.last_update_success:
+            changed = set()
+
+        self._dispatched_success = self.last_update_success
+        self.changed_devices = set()
+        self._async_update_device_registry(changed)
+        if changed is None:
+            changed = set(self._device_listeners)
+        changed.discard(COORDINATOR)
+
+        self.state_write_time = 0.0
+        start = perf_counter()
+        self.async_update_device_listeners(changed)
+        self.timers["dispatch"].add(perf_counter() - start - self.state_write_time)
+        self.timers["state_writes"].add(self.state_write_time)
+        # Coordinator diagnostics change on every update, failed or not. They
+        # go last, so the timing sensors show the timings of this update.
+        self.async_update_device_listeners({COORDINATOR})
+
+    @property
+    def entity_plan(self) -> EntityPlan:
+        """Return the entities for the devices of the current snapshot.
+
+        Entities disabled in the entity registry are left out, changes of
+        values only they show do not update the device.
+        """
+        if (
+            self._entity_plan is None
+            or self._entity_plan.devices is not self.data.devices
+        ):
+            registry = er.async_get(self.hass)
+
+            def is_disabled(platform: str, unique_id: str) -> bool:
+                """Return if the registry holds the entity as disabled."""
+                entity_id = registry.async_get_entity_id(platform, DOMAIN, unique_id)
+                return entity_id is not None and registry.entities[entity_id].disabled
+
+            self._entity_plan = build_entity_plan(self.data.devices, is_disabled)
+        return self._entity_plan
+
+    @property
+    def circuit_state(self) -> str:
+        """Return the state of the circuit breaker."""
+        return self.breaker.state
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return the number of consecutive failed updates."""
+        return self.breaker.failures
+
+    @property
+    def stale_age(self) -> float | None:
+        """Return the age in seconds of the data when serving stale data."""
+        if not self.stale or self._last_good_update is None:
+            return None
+        return round(monotonic() - self._last_good_update, 1)
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh that reflects changes made before this call.
+
+        Returns without waiting for the refresh, see async_schedule_refresh.
+        """
+        self.async_schedule_refresh()
+
+    @callback
+    def async_schedule_refresh(self) -> asyncio.Task[None] | None:
+        """Schedule a refresh that reflects changes made before this call.
+
+        All requests share one follow-up refresh. It runs after a cooldown,
+        or joins a fetch that started after the latest request, so the
+        gateway is never fetched twice for the same change. Callers that
+        need the refreshed data await the returned task, shielded as it is
+        shared.
+        """
+        if self._shut_down:
+            return None
+        self._follow_up_requested = monotonic()
+        if self._follow_up is None or self._follow_up.done():
+            self._follow_up = self.hass.async_create_task(
+                self._async_follow_up_refresh()
+            )
+            self._follow_ups.add(self._follow_up)
+            self._follow_up.add_done_callback(self._follow_ups.discard)
+        return self._follow_up
+
+    async def _async_follow_up_refresh(self) -> None:
+        """Refresh once after the cooldown, unless a fetch already covers it."""
+        await asyncio.sleep(REFRESH_COOLDOWN)
+        # Requests from now on need a fetch that starts after this one
+        self._follow_up = None
+        requested = self._follow_up_requested
+        if (task := self._fetch_task) is not None and not task.done():
+            started = self._fetch_started
+            await asyncio.wait((task,))
+            if started < requested:
+                await self._async_forced_refresh()
+        else:
+            await self._async_forced_refresh()
+        if not self._shut_down:
+            self.optimistic.async_converge(
+                self._async_forced_refresh,
+                lambda: self.last_update_success,
+                REFRESH_COOLDOWN,
+            )
+
+    async def _async_forced_refresh(self) -> None:
+        """Refresh outside the schedule, without adapting the update interval."""
+        self._forced_refresh = True
+        await self.async_refresh()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the refreshes and commands still scheduled, e.g. when unloading.
+
+        Regular polling stops with the last listener, this stops the
+        follow-up and convergence refreshes and the coalesced commands.
+        """
+        self._shut_down = True
+        self._follow_up = None
+        for task in self._follow_ups:
+            task.cancel()
+        self.optimistic.async_stop()
+        self.coalescer.async_cancel()
 
     async def _async_update_data(self) -> PlugwiseData:
+        """Fetch data, joining the fetch that is already in flight."""
+        forced, self._forced_refresh = self._forced_refresh, False
+        if self._fetch_task is None or self._fetch_task.done():
+            self._fetch_started = monotonic()
+            self._fetch_forced = forced
+            self._fetch_task = self.hass.async_create_task(
+                self._async_fetch_or_serve_stale()
+            )
+        return await asyncio.shield(self._fetch_task)
+
+    async def _async_fetch_or_serve_stale(self) -> PlugwiseData:
+        """Fetch data, serve the last good data while within the stale TTL."""
+        try:
+            data = await self._async_guarded_fetch_data()
+        except (UpdateFailed, asyncio.TimeoutError) as err:
+            if self.data is None or self._last_good_update is None:
+                raise
+            if monotonic() - self._last_good_update >= self.stale_ttl.total_seconds():
+                self.stale = False
+                raise
+            if not self.stale:
+                LOGGER.warning(
+                    "Serving last known data of %s, update failed: %s",
+                    self.api.smile_name,
+                    err,
+                )
+            self.stale = True
+            return self.data
+
+        if self.stale:
+            LOGGER.info("Plugwise %s no longer serving stale data", self.api.smile_name)
+        self.stale = False
+        self._last_good_update = monotonic()
+        return data
+
+    async def _async_guarded_fetch_data(self) -> PlugwiseData:
+        """Fetch data, unless backing off from a failing gateway."""
+        if not self.breaker.allow_request():
+            raise UpdateFailed(
+                f"Backing off from {self.api.smile_name} after "
+                f"{self.consecutive_failures} failed updates"
+            )
+
+        try:
+            data = await self._async_fetch_data()
+        except (UpdateFailed, asyncio.TimeoutError):
+            self._async_record_failure()
+            raise
+
+        if self.consecutive_failures:
+            LOGGER.info(
+                "Plugwise %s recovered after %s failed updates",
+                self.api.smile_name,
+                self.consecutive_failures,
+            )
+            if self.update_interval is not None:
+                self.update_interval = self._interval_before_failure
+        self.breaker.record_success()
+        return data
+
+    @callback
+    def _async_record_failure(self) -> None:
+        """Back off exponentially, open the circuit after repeated failures."""
+        if not self.consecutive_failures:
+            self._interval_before_failure = self.update_interval
+        was_open = self.circuit_state != CIRCUIT_CLOSED
+        delay = self.breaker.record_failure()
+        if not was_open and self.circuit_state == CIRCUIT_OPEN:
+            LOGGER.warning(
+                "Plugwise %s failed %s times, backing off",
+                self.api.smile_name,
+                self.consecutive_failures,
+            )
+        if self.update_interval is not None:
+            self.update_interval = delay
+
+    async def _async_fetch_data(self) -> PlugwiseData:
         """Fetch data from Plugwise."""
         try:
-            data = await self.api.async_update()
+            if not self.connected:
+                self.connected = await self.scheduler.async_run(
+                    LANE_POLL, async_connect_smile, self.hass, self.api
+                )
+                if not self.connected:
+                    raise UpdateFailed(f"Unable to connect to {self.api.smile_name}")
+                self._async_topology_rebuilt()
+            self._topology_polls_left -= 1
+            if self._topology_polls_left <= 0 and self._topology_rebuild_supported:
+                data = await self.scheduler.async_run(
+                    LANE_POLL, self._async_rebuild_topology
+                )
+            else:
+                data = await self.scheduler.async_run(
+                    LANE_POLL, self._async_timed_update
+                )
             LOGGER.debug("Plugwise %s updated", self.api.smile_name)
+        except InvalidAuthentication as err:
+            # Set up from the cache or rebuilding the topology, this is the
+            # first time the Smile is asked since the entry was set up
+            LOGGER.error(
+                "Invalid username or Smile ID for %s, stopped polling",
+                self.api.smile_name,
+            )
+            self.update_interval = None
+            self.optimistic.async_stop()
+            raise UpdateFailed(
+                f"Authentication failed for: {self.api.smile_name}"
+            ) from err
         except XMLDataMissingError as err:
             raise UpdateFailed(
                 f"No XML data received for: {self.api.smile_name}"
@@ -51,4 +696,190 @@ class PlugwiseDataUpdateCoordinator(DataUpdateCoordinator[PlugwiseData]):
         except PlugwiseException as err:
             raise UpdateFailed(f"Updated failed for: {self.api.smile_name}") from err
         LOGGER.debug("Data: %s", PlugwiseData(*data))
-        return PlugwiseData(*data)
+        with self.timers["snapshot"].measure():
+            return self._async_build_snapshot(PlugwiseData(*data))
+
+    @property
+    def _topology_rebuild_supported(self) -> bool:
+        """Return if devices can join or leave, a P1 has a fixed topology."""
+        return self._api_factory is not None and self.api.smile_type != "power"
+
+    async def _async_rebuild_topology(self) -> list[Any]:
+        """Fetch the data from a new connection, with the current topology.
+
+        A connected Smile never reads its locations and modules again and
+        never forgets a device, so zones and devices that joined or left
+        are only found by a new Smile, which then replaces the current one.
+        """
+        start = perf_counter()
+        api = self._api_factory()
+        if not await api.connect():
+            raise UpdateFailed(f"Unable to connect to {self.api.smile_name}")
+        await self.hass.async_add_executor_job(api.get_all_devices)
+        LOGGER.debug(
+            "Device topology of %s rebuilt in %.3f s",
+            self.api.smile_name,
+            perf_counter() - start,
+        )
+        with self.timers["fetch"].measure():
+            data = await api.async_update()
+        self.api = api
+        self._async_topology_rebuilt()
+        return data
+
+    async def _async_timed_update(self) -> list[Any]:
+        """Fetch the data, timing the request without its wait in the queue."""
+        with self.timers["fetch"].measure():
+            return await self.api.async_update()
+
+    @callback
+    def _async_build_snapshot(self, data: PlugwiseData) -> PlugwiseData:
+        """Return a snapshot of the data and record which devices changed.
+
+        The plugwise library updates its device dicts in place, so the
+        snapshot owns copies of the devices that changed and reuses the
+        previous copies of those that did not. Between metadata refreshes
+        only the live values are compared, the metadata is carried forward.
+        Values only shown by disabled entities are ignored, see entity_plan.
+        """
+        self._metadata_polls_left -= 1
+        if (previous := self.data) is None:
+            self._metadata_polls_left = METADATA_REFRESH_POLLS
+            self.changed_devices = None
+            self._topology_rebuilt = False
+            self._async_update_notifications(data.gateway.get("notifications", {}))
+            return PlugwiseData(deepcopy(data.gateway), deepcopy(data.devices))
+
+        refresh_metadata = self._metadata_polls_left <= 0
+        if refresh_metadata:
+            self._metadata_polls_left = METADATA_REFRESH_POLLS
+
+        changed: set[str] = set(previous.devices) - set(data.devices)
+        devices: dict[str, dict[str, Any]] = {}
+        unused_keys = self._entity_plan.unused_keys if self._entity_plan else {}
+        for device_id, device in data.devices.items():
+            old_device = previous.devices.get(device_id)
+            if old_device is not None and not refresh_metadata:
+                live = {
+                    key: value
+                    for key, value in device.items()
+                    if key not in METADATA_KEYS
+                }
+                if _live_values_equal(old_device, live, unused_keys.get(device_id)):
+                    devices[device_id] = old_device
+                    continue
+                metadata = {
+                    key: old_device[key] for key in METADATA_KEYS if key in old_device
+                }
+                devices[device_id] = {**metadata, **deepcopy(live)}
+                changed.add(device_id)
+                continue
+            if old_device == device:
+                devices[device_id] = old_device
+                continue
+            devices[device_id] = deepcopy(device)
+            changed.add(device_id)
+
+        gateway = previous.gateway
+        if data.gateway != gateway:
+            gateway = deepcopy(data.gateway)
+            # Gateway data (e.g. notifications) is shown by the gateway device
+            changed.add(gateway["gateway_id"])
+            self._async_update_notifications(gateway.get("notifications", {}))
+
+        if self.changed_devices is not None:
+            changed |= self.changed_devices
+        self.optimistic.async_reconcile(data.devices, devices, changed)
+        if topology := self._async_confirm_topology(
+            topology_change(previous.devices, devices, changed), devices
+        ):
+            self._topology_change = topology
+        self.changed_devices = changed
+        if self.restored:
+            # Every entity drops its assumed state
+            self.restored = False
+            self.changed_devices = None
+        LOGGER.debug("Changed devices: %s", changed)
+        if not self._fetch_forced:
+            self._async_adapt_update_interval(bool(changed))
+        return PlugwiseData(gateway, devices)
+
+    @callback
+    def _async_confirm_topology(
+        self, topology: TopologyChange | None, devices: dict[str, dict[str, Any]]
+    ) -> TopologyChange | None:
+        """Return the topology change with only the confirmed removals.
+
+        Devices and entities are removed from the registries once they are
+        missing from TOPOLOGY_CONFIRMATIONS topology rebuilds, until then
+        they are unavailable and keep their customisations.
+        """
+        rebuilt, self._topology_rebuilt = self._topology_rebuilt, False
+        if topology is not None:
+            for device_id in topology.removed_devices:
+                self._missing_devices.setdefault(device_id, 0)
+            for entity in topology.removed_entities:
+                self._missing_entities.setdefault(entity, 0)
+        for device_id in self._missing_devices.keys() & devices.keys():
+            del self._missing_devices[device_id]
+        for entity in [
+            entity
+            for entity in self._missing_entities
+            if entity_reported(devices, *entity)
+        ]:
+            del self._missing_entities[entity]
+        if not rebuilt:
+            return topology and TopologyChange(set(), set())
+
+        removed = TopologyChange(
+            _confirm_missing(self._missing_devices),
+            _confirm_missing(self._missing_entities),
+        )
+        if topology is None and not any(removed):
+            return None
+        return removed
+
+    @callback
+    def _async_update_notifications(
+        self, notifications: dict[str, dict[str, str]]
+    ) -> None:
+        """Create new and dismiss resolved Plugwise notifications."""
+        for notify_id in self._notification_ids - set(notifications):
+            self.hass.components.persistent_notification.async_dismiss(
+                f"{DOMAIN}.{notify_id}"
+            )
+        for notify_id in set(notifications) - self._notification_ids:
+            self.hass.components.persistent_notification.async_create(
+                notifications[notify_id],
+                "Plugwise Notification:",
+                f"{DOMAIN}.{notify_id}",
+            )
+        self._notification_ids = set(notifications)
+
+        attrs: dict[str, list[str]] = {f"{severity}_msg": [] for severity in SEVERITIES}
+        for details in notifications.values():
+            for msg_type, msg in details.items():
+                msg_type = msg_type.lower()
+                if msg_type not in SEVERITIES:
+                    msg_type = "other"
+                attrs[f"{msg_type}_msg"].append(msg)
+        self.notification_attrs = attrs
+
+    @callback
+    def _async_adapt_update_interval(self, changed: bool) -> None:
+        """Poll faster while data changes, slow down towards the ceiling if not."""
+        if changed:
+            self._adaptive_streak = max(self._adaptive_streak, 0) + 1
+        else:
+            self._adaptive_streak = min(self._adaptive_streak, 0) - 1
+        if abs(self._adaptive_streak) < ADAPTIVE_POLLS or self.update_interval is None:
+            return
+
+        self._adaptive_streak = 0
+        interval = self.update_interval * (
+            ADAPTIVE_SPEEDUP if changed else ADAPTIVE_SLOWDOWN
+        )
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        if interval != self.update_interval:
+            LOGGER.debug("DUC update interval adapted to: %s", interval)
+            self.update_interval = interval
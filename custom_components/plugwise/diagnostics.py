@@ -20,4 +20,20 @@ async def async_get_config_entry_diagnostics(
     return {
         "gateway": coordinator.data.gateway,
         "devices": coordinator.data.devices,
+        "coordinator": {
+            "state_writes": coordinator.state_writes,
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "stale_age": coordinator.stale_age,
+            "circuit_state": coordinator.circuit_state,
+            "consecutive_failures": coordinator.consecutive_failures,
+            "timings": {
+                phase: timer.stats for phase, timer in coordinator.timers.items()
+            },
+            "setup": coordinator.setup_timings,
+            "scheduler": coordinator.scheduler.stats,
+            "convergence": {
+                kind: timer.stats
+                for kind, timer in coordinator.optimistic.convergence.items()
+            },
+        },
     }
@@ -1,18 +1,18 @@
 """Generic Plugwise Entity Class."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from time import perf_counter
 from typing import Any
 
-from homeassistant.const import ATTR_NAME, ATTR_VIA_DEVICE, CONF_HOST
-from homeassistant.helpers.device_registry import (
-    CONNECTION_NETWORK_MAC,
-    CONNECTION_ZIGBEE,
-)
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
 from .coordinator import PlugwiseData, PlugwiseDataUpdateCoordinator
+from .plan import EntitySpec, TopologyChange
 
 
 class PlugwiseEntity(CoordinatorEntity[PlugwiseData]):
@@ -28,51 +28,100 @@ class PlugwiseEntity(CoordinatorEntity[PlugwiseData]):
         """Initialise the gateway."""
         super().__init__(coordinator)
         self._dev_id = device_id
-
-        configuration_url: str | None = None
-        if entry := self.coordinator.config_entry:
-            configuration_url = f"http://{entry.data[CONF_HOST]}"
-
-        data = coordinator.data.devices[device_id]
-        connections = set()
-        if mac := data.get("mac_address"):
-            connections.add((CONNECTION_NETWORK_MAC, mac))
-        if mac := data.get("zigbee_mac_address"):
-            connections.add((CONNECTION_ZIGBEE, mac))
-
-        self._attr_device_info = DeviceInfo(
-            configuration_url=configuration_url,
-            identifiers={(DOMAIN, device_id)},
-            connections=connections,
-            manufacturer=data.get("vendor"),
-            model=data.get("model"),
-            name=f"Smile {coordinator.data.gateway['smile_name']}",
-            sw_version=data.get("fw"),
-            hw_version=data.get("hw"),
-        )
-
-        if device_id != coordinator.data.gateway["gateway_id"]:
-            self._attr_device_info.update(
-                {
-                    ATTR_NAME: data.get("name"),
-                    ATTR_VIA_DEVICE: (
-                        DOMAIN,
-                        str(self.coordinator.data.gateway["gateway_id"]),
-                    ),
-                }
-            )
+        self._listen_device_ids = {device_id}
+        self._written_fingerprint: tuple[Any, ...] | None = None
+        self._attr_device_info = coordinator.async_device_info(device_id)
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         return super().available and self._dev_id in self.coordinator.data.devices
 
+    @property
+    def assumed_state(self) -> bool:
+        """Return True while showing the state restored at startup."""
+        return self.coordinator.restored
+
     @property
     def device(self) -> dict[str, Any]:
         """Return data for this device."""
         return self.coordinator.data.devices[self._dev_id]
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state, unless value and attributes are unchanged."""
+        fingerprint: tuple[Any, ...] = (False,)
+        if self.available:
+            fingerprint = (
+                True,
+                self.state,
+                self.state_attributes,
+                self.extra_state_attributes,
+                # Options, presets and modes, e.g. select options
+                self.capability_attributes,
+                self.supported_features,
+                self.icon,
+                self.assumed_state,
+            )
+        if fingerprint == self._written_fingerprint:
+            self.coordinator.state_writes["suppressed"] += 1
+            return
+
+        self._written_fingerprint = fingerprint
+        self.coordinator.state_writes["emitted"] += 1
+        start = perf_counter()
+        self.async_write_ha_state()
+        self.coordinator.state_write_time += perf_counter() - start
+
     async def async_added_to_hass(self) -> None:
-        """Subscribe to updates."""
+        """Subscribe to updates of the device(s) this entity represents."""
         self._handle_coordinator_update()
-        await super().async_added_to_hass()
+        # Skip the CoordinatorEntity listener, it would wake this entity on
+        # every poll. Only listen to the devices this entity depends on.
+        await super(CoordinatorEntity, self).async_added_to_hass()
+        for device_id in self._listen_device_ids:
+            self.async_on_remove(
+                self.coordinator.async_add_device_listener(
+                    device_id, self._handle_coordinator_update
+                )
+            )
+
+
+@callback
+def async_add_planned_entities(
+    coordinator: PlugwiseDataUpdateCoordinator,
+    config_entry: ConfigEntry,
+    platform: Platform,
+    entity_class: Callable[[PlugwiseDataUpdateCoordinator, EntitySpec], PlugwiseEntity],
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add the planned entities of platform, also when devices join later."""
+    # Device id by unique_id of the entities added
+    added: dict[str, str] = {}
+
+    @callback
+    def async_add_new_entities(topology: TopologyChange | None = None) -> None:
+        """Add the entities of the plan that were not added yet."""
+        if topology is not None:
+            # The coordinator removed these, they are added again on return
+            for unique_id, device_id in list(added.items()):
+                if (
+                    device_id in topology.removed_devices
+                    or (platform, unique_id) in topology.removed_entities
+                ):
+                    del added[unique_id]
+
+        specs = [
+            spec
+            for spec in coordinator.entity_plan.specs[platform]
+            if spec.unique_id not in added
+        ]
+        if not specs:
+            return
+        added.update((spec.unique_id, spec.device_id) for spec in specs)
+        async_add_entities(entity_class(coordinator, spec) for spec in specs)
+
+    async_add_new_entities()
+    config_entry.async_on_unload(
+        coordinator.async_add_topology_listener(async_add_new_entities)
+    )
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import asyncio
 from datetime import timedelta
+from functools import partial
+from time import monotonic
 from typing import Any
 import voluptuous as vol
 
@@ -17,18 +19,23 @@ from homeassistant.const import (
     CONF_PORT,
     CONF_USERNAME,
     CONF_SCAN_INTERVAL,
+    EVENT_HOMEASSISTANT_STARTED,
     Platform,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, CoreState, Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_registry import RegistryEntry, async_migrate_entries
 
 from .const import (
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_STALE_TTL,
     COORDINATOR,
     DEFAULT_PORT,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_TTL,
     DEFAULT_USERNAME,
     DOMAIN,
     GATEWAY,
@@ -38,53 +45,96 @@ from .const import (
     SERVICE_DELETE,
     UNDO_UPDATE_LISTENER,
 )
-from .coordinator import PlugwiseDataUpdateCoordinator
+from .coordinator import PlugwiseDataUpdateCoordinator, async_connect_smile
+from .handoff import async_claim_api, gateway_handoff_key
+from .services import async_setup_services
+from .storage import PlugwiseStore
 
 
 async def async_setup_entry_gw(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Plugwise Smiles from a config entry."""
+    setup_start = monotonic()
     await async_migrate_entries(hass, entry.entry_id, async_migrate_entity_entry)
 
-    websession = async_get_clientsession(hass, verify_ssl=False)
-    api = Smile(
-        host=entry.data[CONF_HOST],
-        username=entry.data.get(CONF_USERNAME, DEFAULT_USERNAME),
-        password=entry.data[CONF_PASSWORD],
-        port=entry.data.get(CONF_PORT, DEFAULT_PORT),
-        timeout=30,
-        websession=websession,
-    )
+    store = PlugwiseStore(hass, entry.entry_id)
+    cache = None
+    # The config flow hands over the Smile it connected to moments ago
+    if (api := async_claim_api(hass, gateway_handoff_key(entry.data))) is None:
+        api = _async_create_smile(hass, entry)
+        cache = await store.async_load()
+        handed_over = False
+    else:
+        handed_over = True
 
-    try:
-        connected = await api.connect()
-    except InvalidAuthentication:
-        LOGGER.error("Invalid username or Smile ID")
-        return False
-    except PlugwiseException as err:
-        raise ConfigEntryNotReady(
-            f"Error while communicating to device {api.smile_name}"
-        ) from err
-    except asyncio.TimeoutError as err:
-        raise ConfigEntryNotReady(
-            f"Timeout while connecting to Smile {api.smile_name}"
-        ) from err
-
-    if not connected:
-        raise ConfigEntryNotReady("Unable to connect to Smile")
-    api.get_all_devices()
+    if cache is not None:
+        # Restore the last known data, connect with the first refresh
+        cached_data = store.restore_smile(api)
+        connected = False
+    else:
+        try:
+            connected = await async_connect_smile(hass, api, handed_over)
+        except InvalidAuthentication:
+            LOGGER.error("Invalid username or Smile ID")
+            return False
+        except PlugwiseException as err:
+            raise ConfigEntryNotReady(
+                f"Error while communicating to device {api.smile_name}"
+            ) from err
+        except asyncio.TimeoutError as err:
+            raise ConfigEntryNotReady(
+                f"Timeout while connecting to Smile {api.smile_name}"
+            ) from err
+
+        if not connected:
+            raise ConfigEntryNotReady("Unable to connect to Smile")
 
     if entry.unique_id is None and api.smile_version[0] != "1.8.0":
         hass.config_entries.async_update_entry(entry, unique_id=api.smile_hostname)
 
-    update_interval = timedelta(
-        seconds=entry.options.get(
-            CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL[api.smile_type]
-        )
+    scan_interval = entry.options.get(
+        CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL[api.smile_type]
+    )
+    update_interval = timedelta(seconds=scan_interval)
+    # The options flow keeps the scan interval within the bounds
+    min_interval = timedelta(
+        seconds=entry.options.get(CONF_MIN_SCAN_INTERVAL, scan_interval)
+    )
+    max_interval = timedelta(
+        seconds=entry.options.get(CONF_MAX_SCAN_INTERVAL, scan_interval)
+    )
+    LOGGER.debug(
+        "DUC update iterval: %s (bounds: %s - %s)",
+        update_interval,
+        min_interval,
+        max_interval,
     )
-    LOGGER.debug("DUC update iterval: %s", update_interval)
 
-    coordinator = PlugwiseDataUpdateCoordinator(hass, api, update_interval)
-    await coordinator.async_config_entry_first_refresh()
+    stale_ttl = timedelta(seconds=entry.options.get(CONF_STALE_TTL, DEFAULT_STALE_TTL))
+
+    coordinator = PlugwiseDataUpdateCoordinator(
+        hass,
+        api,
+        update_interval,
+        min_interval,
+        max_interval,
+        stale_ttl,
+        connected,
+        partial(_async_create_smile, hass, entry),
+    )
+    if cache is None:
+        await coordinator.async_config_entry_first_refresh()
+        coordinator.setup_timings["time_to_first_data"] = round(
+            monotonic() - setup_start, 3
+        )
+        await store.async_save(api, coordinator.data)
+    else:
+        # Entities restore the cached state, marked as assumed, until the
+        # first refresh after startup. Devices that joined or left since
+        # they were cached are then added or removed by the coordinator.
+        coordinator.async_restore(cached_data)
+        _async_check_cache(entry, coordinator, store, setup_start)
+        _async_refresh_after_start(hass, entry, coordinator)
+    entry.async_on_unload(store.async_track(coordinator))
 
     undo_listener = entry.add_update_listener(_update_listener)
 
@@ -106,9 +156,11 @@ async def async_setup_entry_gw(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     async def delete_notification(self):
         """Service: delete the Plugwise Notification."""
+        # The coordinator replaces its Smile when rebuilding the topology
+        api = coordinator.api
         LOGGER.debug("Service delete PW Notification called for %s", api.smile_name)
         try:
-            deleted = await api.delete_notification()
+            deleted = await coordinator.async_send_command(api.delete_notification)
             LOGGER.debug("PW Notification deleted: %s", deleted)
         except PlugwiseException:
             LOGGER.debug(
@@ -116,16 +168,99 @@ async def async_setup_entry_gw(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             )
 
     hass.config_entries.async_setup_platforms(entry, PLATFORMS_GATEWAY)
+    coordinator.setup_timings["setup"] = round(monotonic() - setup_start, 3)
+    LOGGER.debug(
+        "Setup of %s took %s s", entry.title, coordinator.setup_timings["setup"]
+    )
 
     for component in PLATFORMS_GATEWAY:
         if component == Platform.CLIMATE:
             hass.services.async_register(
                 DOMAIN, SERVICE_DELETE, delete_notification, schema=vol.Schema({})
             )
+            async_setup_services(hass)
 
     return True
 
 
+@callback
+def _async_create_smile(hass: HomeAssistant, entry: ConfigEntry) -> Smile:
+    """Return a new Smile for the gateway of the config entry."""
+    return Smile(
+        host=entry.data[CONF_HOST],
+        username=entry.data.get(CONF_USERNAME, DEFAULT_USERNAME),
+        password=entry.data[CONF_PASSWORD],
+        port=entry.data.get(CONF_PORT, DEFAULT_PORT),
+        timeout=30,
+        websession=async_get_clientsession(hass, verify_ssl=False),
+    )
+
+
+@callback
+def _async_check_cache(
+    entry: ConfigEntry,
+    coordinator: PlugwiseDataUpdateCoordinator,
+    store: PlugwiseStore,
+    setup_start: float,
+) -> None:
+    """Time the first live data and compare the handshake with the cache."""
+
+    @callback
+    def check() -> None:
+        """Compare the first live data with the cache."""
+        if coordinator.restored or not coordinator.last_update_success:
+            return
+        remove_listener()
+        coordinator.setup_timings["time_to_first_data"] = round(
+            monotonic() - setup_start, 3
+        )
+        if not store.handshake_matches(coordinator.api):
+            LOGGER.info(
+                "Firmware or hostname of Smile %s changed since it was cached",
+                entry.title,
+            )
+
+    remove_check: CALLBACK_TYPE | None = coordinator.async_add_listener(check)
+
+    @callback
+    def remove_listener() -> None:
+        """Stop checking, once done or when unloading."""
+        nonlocal remove_check
+        if remove_check is not None:
+            remove_check()
+            remove_check = None
+
+    entry.async_on_unload(remove_listener)
+
+
+@callback
+def _async_refresh_after_start(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: PlugwiseDataUpdateCoordinator
+) -> None:
+    """Refresh once Home Assistant has started, right away if it is running."""
+    if hass.state == CoreState.running:
+        hass.async_create_task(coordinator.async_refresh())
+        return
+
+    async def refresh(event: Event) -> None:
+        """Refresh after startup."""
+        nonlocal remove_started
+        remove_started = None
+        await coordinator.async_refresh()
+
+    remove_started: CALLBACK_TYPE | None = hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_STARTED, refresh
+    )
+
+    @callback
+    def remove_listener() -> None:
+        """Stop waiting for startup when unloading."""
+        if remove_started is not None:
+            remove_started()
+
+    entry.async_on_unload(remove_listener)
+
+
 async def _update_listener(hass: HomeAssistant, entry: ConfigEntry):
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -136,7 +271,7 @@ async def async_unload_entry_gw(hass: HomeAssistant, entry: ConfigEntry):
     if unload_ok := await hass.config_entries.async_unload_platforms(
         entry, PLATFORMS_GATEWAY
     ):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN].pop(entry.entry_id)[COORDINATOR].async_shutdown()
     return unload_ok
 
 
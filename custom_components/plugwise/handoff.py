@@ -0,0 +1,79 @@
+"""Hand APIs connected by the config flow over to entry setup."""
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Mapping
+from typing import Any, NamedTuple
+
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    CONF_USB_PATH,
+    DEFAULT_PORT,
+    DEFAULT_USERNAME,
+    DOMAIN,
+    HANDOFF_TTL,
+    LOGGER,
+)
+
+# Kept apart from hass.data[DOMAIN], which only holds loaded entries
+HANDOFF = f"{DOMAIN}_handoff"
+
+
+class _Handoff(NamedTuple):
+    """A connected API waiting to be claimed."""
+
+    api: Any
+    cancel_expiry: CALLBACK_TYPE
+
+
+def gateway_handoff_key(data: Mapping[str, Any]) -> Hashable:
+    """Return the handoff key for the connection data of a Smile."""
+    return (
+        data[CONF_HOST],
+        data.get(CONF_PORT, DEFAULT_PORT),
+        data.get(CONF_USERNAME, DEFAULT_USERNAME),
+        data[CONF_PASSWORD],
+    )
+
+
+def usb_handoff_key(device_path: str) -> Hashable:
+    """Return the handoff key for a USB-Stick."""
+    return (CONF_USB_PATH, device_path)
+
+
+@callback
+def async_offer_api(
+    hass: HomeAssistant,
+    key: Hashable,
+    api: Any,
+    release: Callable[[Any], None] | None = None,
+) -> None:
+    """Offer a connected API to the entry setup for HANDOFF_TTL seconds.
+
+    Release is called with the API when nobody claimed it in time.
+    """
+    handoffs: dict[Hashable, _Handoff] = hass.data.setdefault(HANDOFF, {})
+    if (previous := handoffs.pop(key, None)) is not None:
+        previous.cancel_expiry()
+
+    @callback
+    def expire(_now: Any) -> None:
+        """Drop the API, it was not claimed in time."""
+        handoffs.pop(key, None)
+        LOGGER.debug("Connection handed over by the config flow expired")
+        if release is not None:
+            release(api)
+
+    handoffs[key] = _Handoff(api, async_call_later(hass, HANDOFF_TTL, expire))
+
+
+@callback
+def async_claim_api(hass: HomeAssistant, key: Hashable) -> Any | None:
+    """Return the API offered for key, if any."""
+    if (handoff := hass.data.get(HANDOFF, {}).pop(key, None)) is None:
+        return None
+    handoff.cancel_expiry()
+    LOGGER.debug("Reusing the connection of the config flow")
+    return handoff.api
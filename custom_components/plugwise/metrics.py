@@ -0,0 +1,48 @@
+"""Rolling statistics for the Plugwise integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter
+
+from .const import ROLLING_SAMPLES
+
+
+class RollingTimer:
+    """Keep the most recent durations of a phase and report percentiles."""
+
+    def __init__(self, size: int = ROLLING_SAMPLES) -> None:
+        """Initialize the timer."""
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        """Record a duration in seconds."""
+        self._samples.append(seconds)
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """Record the duration of the wrapped block."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(perf_counter() - start)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the given percentile in milliseconds."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, round(fraction * (len(samples) - 1)))
+        return round(samples[index] * 1000, 1)
+
+    @property
+    def stats(self) -> dict[str, float | int | None]:
+        """Return p50, p95 and max in milliseconds."""
+        return {
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.percentile(1),
+            "samples": len(self._samples),
+        }
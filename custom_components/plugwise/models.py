@@ -73,6 +73,7 @@ from .const import (
     TARGET_TEMP,
     TEMP_DIFF,
     UNIT_LUMEN,
+    UPDATE_PHASES,
     USB_MOTION_ID,
     USB_RELAY_ID,
     VALVE_POS,
@@ -590,3 +591,30 @@ PW_BINARY_SENSOR_TYPES: tuple[PlugwiseBinarySensorEntityDescription, ...] = (
         entity_registry_enabled_default=False,
     ),
 )
+
+# Diagnostics of the gateway connection, provided by the coordinator
+CIRCUIT_SENSOR = PlugwiseSensorEntityDescription(
+    key="circuit_state",
+    plugwise_api=SMILE,
+    name="Connection state",
+    icon="mdi:lan-connect",
+    entity_category=EntityCategory.DIAGNOSTIC,
+    state_class=None,
+)
+
+# Rolling durations of the update phases, keyed by phase with a _time suffix
+PW_TIMING_SENSOR_TYPES: tuple[PlugwiseSensorEntityDescription, ...] = tuple(
+    PlugwiseSensorEntityDescription(
+        key=f"{phase}_time",
+        plugwise_api=SMILE,
+        name=f"{phase.replace('_', ' ').capitalize()} time",
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        entity_registry_enabled_default=False,
+    )
+    for phase in UPDATE_PHASES
+)
+
+# Sensors of the gateway device showing the coordinator instead of a value
+COORDINATOR_SENSOR_TYPES = (CIRCUIT_SENSOR, *PW_TIMING_SENSOR_TYPES)
@@ -0,0 +1,212 @@
+"""Optimistic state of the commands sent to a Plugwise gateway."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from time import monotonic
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import CONVERGENCE_BACKOFF, LOGGER, OPTIMISTIC_TIMEOUT
+from .metrics import RollingTimer
+
+
+class PendingCommand(NamedTuple):
+    """Expected result of a command, shown until the gateway reports it."""
+
+    kind: str
+    values: dict[str, Any]
+    previous: dict[str, Any]
+    requested: float
+
+
+def _command_kind(values: dict[str, Any]) -> str:
+    """Return the kind of a command, named after the keys it changes."""
+    return ",".join(
+        sorted(
+            sub_key
+            for key, value in values.items()
+            for sub_key in (value if isinstance(value, dict) else (key,))
+        )
+    )
+
+
+def _merge_values(device: dict[str, Any], values: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of the device with the (nested) values applied."""
+    merged = dict(device)
+    for key, value in values.items():
+        if isinstance(value, dict):
+            merged[key] = {**device.get(key, {}), **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def _current_values(device: dict[str, Any], values: dict[str, Any]) -> dict[str, Any]:
+    """Return the current device values for the keys of values."""
+    return {
+        key: (
+            {sub_key: device.get(key, {}).get(sub_key) for sub_key in value}
+            if isinstance(value, dict)
+            else device.get(key)
+        )
+        for key, value in values.items()
+    }
+
+
+class OptimisticCommands:
+    """Track the commands whose result is shown before the gateway reports it.
+
+    The coordinator owns the device data, this keeps per device what each
+    pending command changed and what to restore when it fails. While
+    commands are pending, the gateway is re-polled with growing gaps.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self._pending: dict[str, list[PendingCommand]] = {}
+        self._convergence: asyncio.Task[None] | None = None
+        # Seconds until the gateway reported a command applied, per kind
+        self.convergence: dict[str, RollingTimer] = {}
+
+    def __bool__(self) -> bool:
+        """Return True while commands are pending."""
+        return bool(self._pending)
+
+    @callback
+    def async_add(
+        self, device_id: str, device: dict[str, Any], values: dict[str, Any]
+    ) -> tuple[PendingCommand, dict[str, Any]]:
+        """Record a command, return it and the device data with its values applied.
+
+        Values are device keys, or groups like sensors with a dict of keys.
+        A command supersedes a pending command of the same kind, e.g. when
+        setpoint requests are coalesced.
+        """
+        kind = _command_kind(values)
+        pending = self._pending.setdefault(device_id, [])
+        previous = _current_values(device, values)
+        for command in pending:
+            if command.kind == kind:
+                pending.remove(command)
+                previous = command.previous
+                break
+        command = PendingCommand(kind, values, previous, monotonic())
+        pending.append(command)
+        return command, _merge_values(device, values)
+
+    @callback
+    def async_rollback(
+        self, device_id: str, device: dict[str, Any] | None, command: PendingCommand
+    ) -> dict[str, Any] | None:
+        """Forget a failed command of a device.
+
+        Return the device data with the values from before the command, or
+        None when there is nothing to restore. A command that was superseded
+        or already rolled back or reported has nothing to restore.
+        """
+        pending = self._pending.get(device_id, [])
+        if not any(pending_command is command for pending_command in pending):
+            return None
+        pending[:] = [
+            pending_command
+            for pending_command in pending
+            if pending_command is not command
+        ]
+        if not pending:
+            del self._pending[device_id]
+        if device is None:
+            return None
+        return _merge_values(device, command.previous)
+
+    @callback
+    def async_reconcile(
+        self,
+        reported: dict[str, dict[str, Any]],
+        devices: dict[str, dict[str, Any]],
+        changed: set[str],
+    ) -> None:
+        """Drop commands the gateway reports as applied, re-apply the others.
+
+        Commands not reported within OPTIMISTIC_TIMEOUT are dropped with an
+        error, the snapshot then shows the values reported by the gateway.
+        """
+        now = monotonic()
+        for device_id, pending in list(self._pending.items()):
+            device = reported.get(device_id)
+            still_pending: list[PendingCommand] = []
+            for command in pending:
+                if (
+                    device is not None
+                    and _current_values(device, command.values) == command.values
+                ):
+                    self.convergence.setdefault(command.kind, RollingTimer()).add(
+                        now - command.requested
+                    )
+                    continue
+                if device is None or now - command.requested > OPTIMISTIC_TIMEOUT:
+                    LOGGER.error(
+                        "Plugwise device %s did not apply %s, showing reported state",
+                        device_id,
+                        command.values,
+                    )
+                    continue
+                still_pending.append(command)
+
+            if not still_pending:
+                del self._pending[device_id]
+                continue
+            self._pending[device_id] = still_pending
+            if device_id in changed:
+                for command in still_pending:
+                    devices[device_id] = _merge_values(
+                        devices[device_id], command.values
+                    )
+
+    @callback
+    def async_converge(
+        self,
+        refresh: Callable[[], Awaitable[None]],
+        succeeded: Callable[[], bool],
+        delay: float,
+    ) -> None:
+        """Start re-polling for the pending commands, unless already doing so."""
+        if not self._pending or (
+            self._convergence is not None and not self._convergence.done()
+        ):
+            return
+        self._convergence = self.hass.async_create_task(
+            self._async_converge(refresh, succeeded, delay)
+        )
+
+    async def _async_converge(
+        self,
+        refresh: Callable[[], Awaitable[None]],
+        succeeded: Callable[[], bool],
+        delay: float,
+    ) -> None:
+        """Re-poll with growing gaps until pending commands are reported.
+
+        Commands are dropped by the refresh after OPTIMISTIC_TIMEOUT, so
+        this stops at that deadline, or earlier when a refresh fails and
+        the regular (backed off) polling takes over.
+        """
+        while self._pending and succeeded():
+            delay *= CONVERGENCE_BACKOFF
+            deadline = OPTIMISTIC_TIMEOUT + max(
+                command.requested
+                for pending in self._pending.values()
+                for command in pending
+            )
+            await asyncio.sleep(max(min(delay, deadline - monotonic()), 0) + 0.1)
+            LOGGER.debug("Re-polling for %s pending command(s)", len(self._pending))
+            await refresh()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop re-polling for pending commands, e.g. when unloading."""
+        if self._convergence is not None:
+            self._convergence.cancel()
+            self._convergence = None
@@ -0,0 +1,199 @@
+"""Entity plan for the devices of a Plugwise Smile."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+from homeassistant.const import Platform
+
+from .const import LOGGER, MASTER_THERMOSTATS, SMILE
+from .models import (
+    COORDINATOR_SENSOR_TYPES,
+    PW_BINARY_SENSOR_TYPES,
+    PW_SENSOR_TYPES,
+    PW_SWITCH_TYPES,
+    PlugwiseEntityDescription,
+)
+
+DescriptionIndex = dict[tuple[str, str], PlugwiseEntityDescription]
+
+
+def index_descriptions(
+    descriptions: Iterable[PlugwiseEntityDescription],
+) -> DescriptionIndex:
+    """Return the descriptions by (plugwise_api, key)."""
+    return {
+        (description.plugwise_api, description.key): description
+        for description in descriptions
+    }
+
+
+# Platform and descriptions of the device groups whose keys each become an entity
+ENTITY_GROUPS: dict[str, tuple[Platform, DescriptionIndex]] = {
+    "binary_sensors": (
+        Platform.BINARY_SENSOR,
+        index_descriptions(PW_BINARY_SENSOR_TYPES),
+    ),
+    "sensors": (Platform.SENSOR, index_descriptions(PW_SENSOR_TYPES)),
+    "switches": (Platform.SWITCH, index_descriptions(PW_SWITCH_TYPES)),
+}
+# Platforms with one entity per thermostat
+THERMOSTAT_PLATFORMS = {Platform.CLIMATE: "climate", Platform.SELECT: "select"}
+# (group, key) values the climate entities read from thermostats and heater
+CLIMATE_KEYS = {
+    ("binary_sensors", "cooling_state"),
+    ("binary_sensors", "heating_state"),
+    ("sensors", "setpoint"),
+    ("sensors", "temperature"),
+}
+
+
+class EntitySpec(NamedTuple):
+    """An entity to create for a device."""
+
+    device_id: str
+    unique_id: str
+    name: str | None
+    description: PlugwiseEntityDescription | None = None
+
+
+class EntityPlan(NamedTuple):
+    """The entities of every platform for a snapshot of the devices.
+
+    Disabled entities only exist in the entity registry, the keys that
+    only they show are in unused_keys by device and group.
+    """
+
+    devices: dict[str, dict[str, Any]]
+    specs: dict[Platform, list[EntitySpec]]
+    disabled: dict[Platform, list[EntitySpec]]
+    unused_keys: dict[str, dict[str, set[str]]]
+
+
+class TopologyChange(NamedTuple):
+    """What left the gateway between two snapshots of the devices.
+
+    New devices and keys are added from the entity plan.
+    """
+
+    removed_devices: set[str]
+    removed_entities: set[tuple[Platform, str]]
+
+
+def topology_change(
+    previous: dict[str, dict[str, Any]],
+    devices: dict[str, dict[str, Any]],
+    changed: set[str],
+) -> TopologyChange | None:
+    """Return the topology change between snapshots, None when unchanged.
+
+    Only the changed devices can have gained or lost keys.
+    """
+    topology_changed = previous.keys() != devices.keys()
+    removed_entities: set[tuple[Platform, str]] = set()
+    for device_id in changed & previous.keys() & devices.keys():
+        old_device, device = previous[device_id], devices[device_id]
+        if old_device.get("class") != device.get("class"):
+            topology_changed = True
+            if device.get("class") not in MASTER_THERMOSTATS:
+                removed_entities.update(
+                    (platform, f"{device_id}-{suffix}")
+                    for platform, suffix in THERMOSTAT_PLATFORMS.items()
+                )
+        for group, (platform, _) in ENTITY_GROUPS.items():
+            old_keys = old_device.get(group, {}).keys()
+            keys = device.get(group, {}).keys()
+            if old_keys == keys:
+                continue
+            topology_changed = True
+            removed_entities.update(
+                (platform, f"{device_id}-{key}") for key in old_keys - keys
+            )
+
+    if not topology_changed:
+        return None
+    return TopologyChange(set(previous) - set(devices), removed_entities)
+
+
+def entity_reported(
+    devices: dict[str, dict[str, Any]], platform: Platform, unique_id: str
+) -> bool:
+    """Return if the devices report the value shown by an entity."""
+    device_id, _, suffix = unique_id.partition("-")
+    if (device := devices.get(device_id)) is None:
+        return False
+    if platform in THERMOSTAT_PLATFORMS:
+        return device.get("class") in MASTER_THERMOSTATS
+    return any(
+        group_platform == platform and suffix in device.get(group, {})
+        for group, (group_platform, _) in ENTITY_GROUPS.items()
+    )
+
+
+def build_entity_plan(
+    devices: dict[str, dict[str, Any]],
+    is_disabled: Callable[[Platform, str], bool] | None = None,
+) -> EntityPlan:
+    """Return the entities for the devices, walking every device once.
+
+    is_disabled tells by platform and unique_id if the entity registry
+    holds a disabled entity.
+    """
+    specs: dict[Platform, list[EntitySpec]] = {
+        platform: [] for platform, _ in ENTITY_GROUPS.values()
+    }
+    specs.update({platform: [] for platform in THERMOSTAT_PLATFORMS})
+    disabled: dict[Platform, list[EntitySpec]] = {platform: [] for platform in specs}
+    unused_keys: dict[str, dict[str, set[str]]] = {}
+
+    def add(platform: Platform, spec: EntitySpec) -> bool:
+        """Add the spec, return False when the entity is disabled."""
+        if is_disabled is not None and is_disabled(platform, spec.unique_id):
+            disabled[platform].append(spec)
+            return False
+        specs[platform].append(spec)
+        return True
+
+    for device_id, device in devices.items():
+        device_name = device.get("name")
+        for group, (platform, descriptions) in ENTITY_GROUPS.items():
+            for key, value in device.get(group, {}).items():
+                if (description := descriptions.get((SMILE, key))) is None:
+                    continue
+                # Sensors without a value get no entity
+                if value is None and platform == Platform.SENSOR:
+                    continue
+                spec = EntitySpec(
+                    device_id,
+                    f"{device_id}-{key}",
+                    f"{device_name or ''} {description.name}".lstrip(),
+                    description,
+                )
+                if add(platform, spec) or (group, key) in CLIMATE_KEYS:
+                    continue
+                unused_keys.setdefault(device_id, {}).setdefault(group, set()).add(key)
+
+        if device.get("class") in MASTER_THERMOSTATS:
+            for platform, suffix in THERMOSTAT_PLATFORMS.items():
+                add(
+                    platform,
+                    EntitySpec(device_id, f"{device_id}-{suffix}", device_name),
+                )
+
+        if device.get("class") == "gateway":
+            for description in COORDINATOR_SENSOR_TYPES:
+                add(
+                    Platform.SENSOR,
+                    EntitySpec(
+                        device_id,
+                        f"{device_id}-{description.key}",
+                        f"{device_name or ''} {description.name}".lstrip(),
+                        description,
+                    ),
+                )
+
+    LOGGER.debug(
+        "Planned entities: %s",
+        {platform.value: len(items) for platform, items in specs.items()},
+    )
+    return EntityPlan(devices, specs, disabled, unused_keys)
@@ -0,0 +1,82 @@
+"""Request scheduling for the Plugwise integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import heapq
+from itertools import count
+from time import monotonic
+from typing import Any, TypeVar
+
+from .const import REQUEST_LANES
+from .metrics import RollingTimer
+
+_T = TypeVar("_T")
+
+
+class RequestScheduler:
+    """Send the requests to a gateway one at a time, by lane priority.
+
+    A request waits for the one in flight, queued requests are started in
+    the order of REQUEST_LANES and first come, first served within a lane.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler."""
+        self._busy = False
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = count()
+        self.max_queue_depth = 0
+        # Seconds requests waited before they were sent, per lane
+        self.wait_times = {lane: RollingTimer() for lane in REQUEST_LANES}
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting to be sent."""
+        return sum(not future.done() for _, _, future in self._queue)
+
+    async def async_run(
+        self, lane: str, job: Callable[..., Awaitable[_T]], *args: Any
+    ) -> _T:
+        """Run job(*args) when the requests before it in line are done."""
+        queued = monotonic()
+        if self._busy:
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(
+                self._queue, (REQUEST_LANES.index(lane), next(self._order), future)
+            )
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Handed the turn but cancelled before running
+                    self._release()
+                raise
+        self._busy = True
+        self.wait_times[lane].add(monotonic() - queued)
+        try:
+            return await job(*args)
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the turn to the next waiting request."""
+        self._busy = False
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                self._busy = True
+                future.set_result(None)
+                return
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the queue depth and wait times for diagnostics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "wait_times": {
+                lane: timer.stats for lane, timer in self.wait_times.items()
+            },
+        }
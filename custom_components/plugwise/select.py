@@ -4,15 +4,16 @@ from __future__ import annotations
 from homeassistant.components.select import SelectEntity
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import (
     COORDINATOR,
     DOMAIN,
-    MASTER_THERMOSTATS,
 )
 from .coordinator import PlugwiseDataUpdateCoordinator
-from .entity import PlugwiseEntity
+from .entity import PlugwiseEntity, async_add_planned_entities
+from .plan import EntitySpec
 from .util import plugwise_command
 
 
@@ -23,10 +24,12 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Smile Thermostats from a config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
-    async_add_entities(
-        PlugwiseSelectEntity(coordinator, device_id)
-        for device_id, device in coordinator.data.devices.items()
-        if device["class"] in MASTER_THERMOSTATS
+    async_add_planned_entities(
+        coordinator,
+        config_entry,
+        Platform.SELECT,
+        PlugwiseSelectEntity,
+        async_add_entities,
     )
 
 
@@ -36,12 +39,12 @@ class PlugwiseSelectEntity(PlugwiseEntity, SelectEntity):
     def __init__(
         self,
         coordinator: PlugwiseDataUpdateCoordinator,
-        device_id: str,
+        spec: EntitySpec,
     ) -> None:
         """Set up the Plugwise API."""
-        super().__init__(coordinator, device_id)
-        self._attr_unique_id = f"{device_id}-select"
-        self._attr_name = self.device.get("name")
+        super().__init__(coordinator, spec.device_id)
+        self._attr_unique_id = spec.unique_id
+        self._attr_name = spec.name
 
     @property
     def options(self) -> list[str] | None:
@@ -56,4 +59,12 @@ class PlugwiseSelectEntity(PlugwiseEntity, SelectEntity):
     @plugwise_command
     async def async_select_option(self, option: str) -> None:
         """Change the selected schedule."""
-        await self.coordinator.api.set_schedule_state(loc_id=self.device["location"], name=option, state="on")
+        with self.coordinator.optimistic_command(
+            self._dev_id, {"selected_schedule": option}
+        ):
+            await self.coordinator.async_send_command(
+                self.coordinator.api.set_schedule_state,
+                self.device["location"],
+                option,
+                "on",
+            )
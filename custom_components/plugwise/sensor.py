@@ -1,6 +1,9 @@
 """Plugwise Sensor component for Home Assistant."""
 from __future__ import annotations
 
+from collections.abc import Mapping
+from typing import Any
+
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
@@ -11,16 +14,22 @@ from plugwise.nodes import PlugwiseNode
 
 from .const import (
     CB_NEW_NODE,
+    CIRCUIT_OPEN,
     COORDINATOR,
     DOMAIN,
-    LOGGER,
     PW_TYPE,
     STICK,
     USB,
 )
 from .coordinator import PlugwiseDataUpdateCoordinator
-from .entity import PlugwiseEntity
-from .models import PW_SENSOR_TYPES, PlugwiseSensorEntityDescription
+from .entity import PlugwiseEntity, async_add_planned_entities
+from .models import (
+    CIRCUIT_SENSOR,
+    PW_SENSOR_TYPES,
+    PW_TIMING_SENSOR_TYPES,
+    PlugwiseSensorEntityDescription,
+)
+from .plan import EntitySpec
 from .usb import PlugwiseUSBEntity
 
 PARALLEL_UPDATES = 0
@@ -74,26 +83,24 @@ async def async_setup_entry_gateway(
 ) -> None:
     """Set up the Smile sensors from a config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
-
-    entities: list[PlugwiseSensorEnity] = []
-    for device_id, device in coordinator.data.devices.items():
-        for description in PW_SENSOR_TYPES:
-            if (
-                "sensors" not in device
-                or device["sensors"].get(description.key) is None
-            ):
-                continue
-
-            entities.append(
-                PlugwiseSensorEnity(
-                    coordinator,
-                    device_id,
-                    description,
-                )
-            )
-            LOGGER.debug("Add %s sensor", description.key)
-
-    async_add_entities(entities)
+    async_add_planned_entities(
+        coordinator,
+        config_entry,
+        Platform.SENSOR,
+        _sensor_entity,
+        async_add_entities,
+    )
+
+
+def _sensor_entity(
+    coordinator: PlugwiseDataUpdateCoordinator, spec: EntitySpec
+) -> PlugwiseEntity:
+    """Return the entity of a planned sensor."""
+    if spec.description is CIRCUIT_SENSOR:
+        return PlugwiseCircuitSensorEntity(coordinator, spec)
+    if spec.description in PW_TIMING_SENSOR_TYPES:
+        return PlugwiseTimingSensorEntity(coordinator, spec)
+    return PlugwiseSensorEnity(coordinator, spec)
 
 
 class PlugwiseSensorEnity(PlugwiseEntity, SensorEntity):
@@ -102,14 +109,13 @@ class PlugwiseSensorEnity(PlugwiseEntity, SensorEntity):
     def __init__(
         self,
         coordinator: PlugwiseDataUpdateCoordinator,
-        device_id: str,
-        description: PlugwiseSensorEntityDescription,
+        spec: EntitySpec,
     ) -> None:
         """Initialise the sensor."""
-        super().__init__(coordinator, device_id)
-        self.entity_description = description
-        self._attr_unique_id = f"{device_id}-{description.key}"
-        self._attr_name = (f"{self.device.get('name', '')} {description.name}").lstrip()
+        super().__init__(coordinator, spec.device_id)
+        self.entity_description = spec.description
+        self._attr_unique_id = spec.unique_id
+        self._attr_name = spec.name
 
     @property
     def native_value(self) -> int | float | None:
@@ -117,6 +123,82 @@ class PlugwiseSensorEnity(PlugwiseEntity, SensorEntity):
         return self.device["sensors"].get(self.entity_description.key)
 
 
+class PlugwiseCoordinatorSensorEntity(PlugwiseEntity, SensorEntity):
+    """Represent diagnostics of the Plugwise coordinator."""
+
+    def __init__(
+        self,
+        coordinator: PlugwiseDataUpdateCoordinator,
+        spec: EntitySpec,
+    ) -> None:
+        """Initialise the sensor on the gateway device."""
+        super().__init__(coordinator, spec.device_id)
+        self.entity_description = spec.description
+        self._attr_entity_registry_enabled_default = (
+            spec.description.entity_registry_enabled_default
+        )
+        self._attr_unique_id = spec.unique_id
+        self._attr_name = spec.name
+        self._listen_device_ids = {COORDINATOR}
+
+    @property
+    def available(self) -> bool:
+        """Return True, these sensors also report on failing updates."""
+        return True
+
+
+class PlugwiseCircuitSensorEntity(PlugwiseCoordinatorSensorEntity):
+    """Represent the circuit breaker state of the gateway connection."""
+
+    @property
+    def icon(self) -> str | None:
+        """Return the icon to use in the frontend."""
+        if self.coordinator.circuit_state == CIRCUIT_OPEN:
+            return "mdi:lan-disconnect"
+        return self.entity_description.icon
+
+    @property
+    def native_value(self) -> str:
+        """Return the circuit breaker state."""
+        return self.coordinator.circuit_state
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the failed updates and the age of stale data, if served."""
+        return {
+            "consecutive_failures": self.coordinator.consecutive_failures,
+            "stale_age": self.coordinator.stale_age,
+        }
+
+
+class PlugwiseTimingSensorEntity(PlugwiseCoordinatorSensorEntity):
+    """Represent the rolling duration of a phase of the coordinator update."""
+
+    def __init__(
+        self,
+        coordinator: PlugwiseDataUpdateCoordinator,
+        spec: EntitySpec,
+    ) -> None:
+        """Initialise the sensor of the phase named by the key."""
+        super().__init__(coordinator, spec)
+        self._timer = coordinator.timers[spec.description.key.removesuffix("_time")]
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the 95th percentile duration in milliseconds."""
+        return self._timer.percentile(0.95)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the median, maximum and number of samples."""
+        stats = self._timer.stats
+        return {
+            "median": stats["p50"],
+            "max": stats["max"],
+            "samples": stats["samples"],
+        }
+
+
 class USBSensor(PlugwiseUSBEntity, SensorEntity):
     """Representation of a Plugwise USB sensor."""
 
@@ -0,0 +1,334 @@
+"""Services for Plugwise Smiles."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from time import monotonic
+from typing import Any, Optional
+
+from plugwise.exceptions import PlugwiseException
+import voluptuous as vol
+
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.components.climate.const import ATTR_PRESET_MODE
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_STATE, ATTR_TEMPERATURE
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+
+from .const import (
+    ATTR_LOCATIONS,
+    COORDINATOR,
+    DOMAIN,
+    EVENT_SWITCHES_RESULT,
+    EVENT_ZONES_RESULT,
+    GATEWAY,
+    LOGGER,
+    MASTER_THERMOSTATS,
+    PW_TYPE,
+    SERVICE_SET_SWITCHES,
+    SERVICE_SET_ZONES,
+    SWITCH_WRITE_INTERVAL,
+)
+from .coordinator import PlugwiseDataUpdateCoordinator
+
+SET_ZONES_SCHEMA = vol.All(
+    cv.has_at_least_one_key(ATTR_ENTITY_ID, ATTR_LOCATIONS),
+    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_PRESET_MODE),
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+            vol.Optional(ATTR_LOCATIONS): vol.All(cv.ensure_list, [cv.string]),
+            vol.Exclusive(ATTR_TEMPERATURE, "command"): vol.Coerce(float),
+            vol.Exclusive(ATTR_PRESET_MODE, "command"): cv.string,
+        }
+    ),
+)
+
+SET_SWITCHES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required(ATTR_STATE): cv.boolean,
+    }
+)
+
+# (coordinator, device_id) of the thermostat of a zone
+Zone = tuple[PlugwiseDataUpdateCoordinator, str]
+# Location of a zone and the entity_ids and locations requesting it
+Zones = dict[Zone, tuple[str, list[str]]]
+# (coordinator, device_id, switch key, group members) of a switch, keyed by
+# the entity_id
+Switches = dict[
+    str, tuple[PlugwiseDataUpdateCoordinator, str, str, Optional[list[str]]]
+]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the Smile gateways."""
+    if hass.services.has_service(DOMAIN, SERVICE_SET_ZONES):
+        return
+
+    async def set_zones(call: ServiceCall) -> None:
+        """Service: set the temperature or preset of several zones at once."""
+        start = monotonic()
+        zones = _resolve_zones(hass, call.data)
+        results = await _async_set_zones(zones, call.data)
+        _async_report(hass, EVENT_ZONES_RESULT, results, start)
+
+    async def set_switches(call: ServiceCall) -> None:
+        """Service: switch several relays at once."""
+        start = monotonic()
+        switches, via = _resolve_switches(hass, call.data[ATTR_ENTITY_ID])
+        results = await _async_set_switches(switches, call.data[ATTR_STATE])
+        # Switched by their group relay
+        for entity_id, group_entity_id in via.items():
+            results[entity_id] = {"success": True, "via": group_entity_id}
+        _async_report(hass, EVENT_SWITCHES_RESULT, results, start)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_ZONES, set_zones, schema=SET_ZONES_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_SWITCHES, set_switches, schema=SET_SWITCHES_SCHEMA
+    )
+
+
+@callback
+def _async_report(
+    hass: HomeAssistant,
+    event_type: str,
+    results: dict[str, dict[str, Any]],
+    start: float,
+) -> None:
+    """Fire the results of a batch service, raise when any target failed."""
+    duration = round(monotonic() - start, 3)
+    LOGGER.debug("Plugwise %s took %s s", event_type, duration)
+    hass.bus.async_fire(event_type, {"results": results, "duration": duration})
+    if failed := sorted(
+        target for target, res in results.items() if not res["success"]
+    ):
+        raise HomeAssistantError(f"Failed to update: {', '.join(failed)}")
+
+
+def _gateway_coordinators(
+    hass: HomeAssistant,
+) -> dict[str, PlugwiseDataUpdateCoordinator]:
+    """Return the coordinators of the loaded Smiles by config entry id."""
+    return {
+        entry_id: entry_data[COORDINATOR]
+        for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+        if entry_data.get(PW_TYPE) == GATEWAY
+    }
+
+
+def _resolve_zones(hass: HomeAssistant, data: dict[str, Any]) -> Zones:
+    """Return the thermostat zones for the requested entities and locations.
+
+    A zone requested more than once, e.g. by its entity and its location,
+    gets a single command.
+    """
+    coordinators = _gateway_coordinators(hass)
+    zones: Zones = {}
+    registry = er.async_get(hass)
+    for entity_id in data.get(ATTR_ENTITY_ID, []):
+        if (
+            (entry := registry.async_get(entity_id)) is None
+            or entry.platform != DOMAIN
+            or entry.domain != CLIMATE_DOMAIN
+            or entry.config_entry_id not in coordinators
+        ):
+            raise HomeAssistantError(f"{entity_id} is not a Plugwise climate entity")
+        coordinator = coordinators[entry.config_entry_id]
+        device_id = entry.unique_id.removesuffix("-climate")
+        if (device := coordinator.data.devices.get(device_id)) is None:
+            raise HomeAssistantError(f"{entity_id} is not available")
+        zone = zones.setdefault((coordinator, device_id), (device["location"], []))
+        zone[1].append(entity_id)
+
+    for location in data.get(ATTR_LOCATIONS, []):
+        for coordinator in coordinators.values():
+            device_id = next(
+                (
+                    device_id
+                    for device_id, device in coordinator.data.devices.items()
+                    if device.get("location") == location
+                    and device["class"] in MASTER_THERMOSTATS
+                ),
+                None,
+            )
+            if device_id is not None:
+                zone = zones.setdefault((coordinator, device_id), (location, []))
+                zone[1].append(location)
+                break
+        else:
+            raise HomeAssistantError(f"Unknown Plugwise location: {location}")
+
+    return zones
+
+
+async def _async_set_zones(
+    zones: Zones, data: dict[str, Any]
+) -> dict[str, dict[str, Any]]:
+    """Send the command to every zone, then refresh each gateway once.
+
+    The commands are queued at once, the scheduler of each gateway sends
+    them one at a time.
+    """
+
+    async def set_zone(zone: Zone) -> dict[str, Any]:
+        """Send the command to a single zone."""
+        coordinator, device_id = zone
+        location = zones[zone][0]
+        try:
+            if (temperature := data.get(ATTR_TEMPERATURE)) is not None:
+                with coordinator.optimistic_command(
+                    device_id, {"sensors": {"setpoint": temperature}}
+                ):
+                    latency = await _async_timed_send(
+                        coordinator,
+                        coordinator.api.set_temperature,
+                        location,
+                        temperature,
+                    )
+            else:
+                preset_mode = data[ATTR_PRESET_MODE]
+                with coordinator.optimistic_command(
+                    device_id, {"active_preset": preset_mode}
+                ):
+                    latency = await _async_timed_send(
+                        coordinator, coordinator.api.set_preset, location, preset_mode
+                    )
+        except PlugwiseException as err:
+            LOGGER.error("Failed to update Plugwise zone %s: %s", location, err)
+            return {"success": False, "error": str(err)}
+        return {"success": True, "latency": latency}
+
+    zone_results = await asyncio.gather(*map(set_zone, zones))
+    results = {
+        target: result
+        for (_, targets), result in zip(zones.values(), zone_results)
+        for target in targets
+    }
+    await _async_refresh_once({coordinator for coordinator, _ in zones})
+    return results
+
+
+def _resolve_switches(
+    hass: HomeAssistant, entity_ids: list[str]
+) -> tuple[Switches, dict[str, str]]:
+    """Return the switches to send and the relays switched by a selected group.
+
+    Switching a group relay switches its members, so member relays of a
+    selected group are not sent separately, they map to the group entity_id.
+    """
+    coordinators = _gateway_coordinators(hass)
+    registry = er.async_get(hass)
+    switches: Switches = {}
+    for entity_id in entity_ids:
+        if (
+            (entry := registry.async_get(entity_id)) is None
+            or entry.platform != DOMAIN
+            or entry.domain != SWITCH_DOMAIN
+            or entry.config_entry_id not in coordinators
+        ):
+            raise HomeAssistantError(f"{entity_id} is not a Plugwise switch entity")
+        coordinator = coordinators[entry.config_entry_id]
+        device_id, key = entry.unique_id.split("-", 1)
+        if (device := coordinator.data.devices.get(device_id)) is None:
+            raise HomeAssistantError(f"{entity_id} is not available")
+        switches[entity_id] = (coordinator, device_id, key, device.get("members"))
+
+    covered = {
+        (coordinator, member): entity_id
+        for entity_id, (coordinator, _, key, members) in switches.items()
+        if key == "relay"
+        for member in members or ()
+    }
+    via = {
+        entity_id: covered[coordinator, device_id]
+        for entity_id, (coordinator, device_id, key, _) in switches.items()
+        if key == "relay" and (coordinator, device_id) in covered
+    }
+    return {
+        entity_id: switch
+        for entity_id, switch in switches.items()
+        if entity_id not in via
+    }, via
+
+
+async def _async_set_switches(
+    switches: Switches, state: bool
+) -> dict[str, dict[str, Any]]:
+    """Write the switches paced per gateway, then refresh each gateway once."""
+    by_coordinator: dict[PlugwiseDataUpdateCoordinator, list[str]] = {}
+    for entity_id, (coordinator, _, _, _) in switches.items():
+        by_coordinator.setdefault(coordinator, []).append(entity_id)
+
+    async def set_gateway_switches(
+        entity_ids: list[str],
+    ) -> list[dict[str, Any]]:
+        """Write the switches of one gateway one after another."""
+        results: list[dict[str, Any]] = []
+        for index, entity_id in enumerate(entity_ids):
+            if index:
+                await asyncio.sleep(SWITCH_WRITE_INTERVAL)
+            coordinator, device_id, key, members = switches[entity_id]
+            try:
+                with coordinator.optimistic_command(
+                    device_id, {"switches": {key: state}}
+                ):
+                    latency = await _async_timed_send(
+                        coordinator,
+                        coordinator.api.set_switch_state,
+                        device_id,
+                        members,
+                        key,
+                        "on" if state else "off",
+                    )
+            except PlugwiseException as err:
+                LOGGER.error("Failed to switch %s: %s", entity_id, err)
+                results.append({"success": False, "error": str(err)})
+                continue
+            results.append({"success": True, "latency": latency})
+        return results
+
+    gateway_results = await asyncio.gather(
+        *map(set_gateway_switches, by_coordinator.values())
+    )
+    results = {
+        entity_id: result
+        for entity_ids, gateway_result in zip(by_coordinator.values(), gateway_results)
+        for entity_id, result in zip(entity_ids, gateway_result)
+    }
+    await _async_refresh_once(by_coordinator)
+    return results
+
+
+async def _async_timed_send(
+    coordinator: PlugwiseDataUpdateCoordinator,
+    command: Callable[..., Awaitable[Any]],
+    *args: Any,
+) -> float:
+    """Send a command, return its latency without the wait in the queue."""
+
+    async def timed_command() -> float:
+        """Run the command once it is its turn, return its duration."""
+        start = monotonic()
+        await command(*args)
+        return round(monotonic() - start, 3)
+
+    return await coordinator.async_send_command(timed_command)
+
+
+async def _async_refresh_once(
+    coordinators: Iterable[PlugwiseDataUpdateCoordinator],
+) -> None:
+    """Refresh every gateway that received commands once, wait for the data."""
+    follow_ups = []
+    for coordinator in coordinators:
+        coordinator.async_request_metadata_refresh()
+        if (follow_up := coordinator.async_schedule_refresh()) is not None:
+            follow_ups.append(asyncio.shield(follow_up))
+    await asyncio.gather(*follow_ups)
@@ -0,0 +1,92 @@
+"""Persistent topology and state cache for Plugwise Smiles."""
+from __future__ import annotations
+
+from typing import Any
+
+from plugwise import Smile
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .coordinator import PlugwiseData, PlugwiseDataUpdateCoordinator
+
+# Smile attributes set by connect() that setup needs without a connection
+SMILE_ATTRS = ("gateway_id", "smile_hostname", "smile_name", "smile_type")
+
+
+class PlugwiseStore:
+    """Cache the devices and last known data of a Smile.
+
+    Setup creates the entities from the cache and restores their state,
+    without waiting for the Smile.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self.cache: dict[str, Any] | None = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load the cache."""
+        self.cache = await self._store.async_load()
+        return self.cache
+
+    async def async_remove(self) -> None:
+        """Remove the cache, e.g. when the config entry is removed."""
+        await self._store.async_remove()
+        self.cache = None
+
+    async def async_save(self, api: Smile, data: PlugwiseData) -> None:
+        """Cache the data now."""
+        await self._store.async_save(self._cache_data(api, data))
+
+    @callback
+    def async_track(self, coordinator: PlugwiseDataUpdateCoordinator) -> CALLBACK_TYPE:
+        """Cache the live data of the coordinator, at most once per delay.
+
+        The Store writes pending data when Home Assistant stops.
+        """
+
+        @callback
+        def schedule_save() -> None:
+            """Schedule caching the data after a successful live update."""
+            if coordinator.last_update_success and not (
+                coordinator.restored or coordinator.stale
+            ):
+                self._store.async_delay_save(
+                    lambda: self._cache_data(coordinator.api, coordinator.data),
+                    STORAGE_SAVE_DELAY,
+                )
+
+        return coordinator.async_add_listener(schedule_save)
+
+    @staticmethod
+    def _cache_data(api: Smile, data: PlugwiseData) -> dict[str, Any]:
+        """Return the data to cache."""
+        return {
+            "smile": {attr: getattr(api, attr) for attr in SMILE_ATTRS},
+            "smile_version": api.smile_version[0],
+            "gateway": {
+                key: value
+                for key, value in data.gateway.items()
+                if key != "notifications"
+            },
+            "devices": data.devices,
+        }
+
+    def handshake_matches(self, api: Smile) -> bool:
+        """Return if firmware and hostname of the Smile match the cache."""
+        assert self.cache is not None
+        return (
+            api.smile_version[0] == self.cache["smile_version"]
+            and api.smile_hostname == self.cache["smile"]["smile_hostname"]
+        )
+
+    def restore_smile(self, api: Smile) -> PlugwiseData:
+        """Set the cached connect() results on api, return the cached data."""
+        assert self.cache is not None
+        for attr, value in self.cache["smile"].items():
+            setattr(api, attr, value)
+        api.smile_version = (self.cache["smile_version"], None)
+        return PlugwiseData(dict(self.cache["gateway"]), dict(self.cache["devices"]))
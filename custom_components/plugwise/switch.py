@@ -18,16 +18,15 @@ from .const import (
     CB_NEW_NODE,
     COORDINATOR,
     DOMAIN,
-    LOGGER,
     PW_TYPE,
-    SMILE,
     STICK,
     USB,
 )
 from .coordinator import PlugwiseDataUpdateCoordinator
-from .entity import PlugwiseEntity
+from .entity import PlugwiseEntity, async_add_planned_entities
 from .util import plugwise_command
 from .models import PW_SWITCH_TYPES, PlugwiseSwitchEntityDescription
+from .plan import EntitySpec
 from .usb import PlugwiseUSBEntity
 
 
@@ -79,18 +78,13 @@ async def async_setup_entry_gateway(
 ) -> None:
     """Set up the Smile switches from a config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
-    entities: list[PlugwiseSwitchEntity] = []
-    for device_id, device in coordinator.data.devices.items():
-        for description in PW_SWITCH_TYPES:
-            if (
-                "switches" not in device
-                or description.key not in device["switches"]
-                or description.plugwise_api != SMILE
-            ):
-                continue
-            entities.append(PlugwiseSwitchEntity(coordinator, device_id, description))
-            LOGGER.debug("Add %s switch", description.key)
-    async_add_entities(entities)
+    async_add_planned_entities(
+        coordinator,
+        config_entry,
+        Platform.SWITCH,
+        PlugwiseSwitchEntity,
+        async_add_entities,
+    )
 
 
 class PlugwiseSwitchEntity(PlugwiseEntity, SwitchEntity):
@@ -99,17 +93,16 @@ class PlugwiseSwitchEntity(PlugwiseEntity, SwitchEntity):
     def __init__(
         self,
         coordinator: PlugwiseDataUpdateCoordinator,
-        device_id: str,
-        description: PlugwiseSwitchEntityDescription,
+        spec: EntitySpec,
     ) -> None:
         """Set up the Plugwise API."""
-        super().__init__(coordinator, device_id)
-        self.entity_description = description
+        super().__init__(coordinator, spec.device_id)
+        self.entity_description = spec.description
         self._attr_entity_registry_enabled_default = (
-            description.entity_registry_enabled_default
+            spec.description.entity_registry_enabled_default
         )
-        self._attr_unique_id = f"{device_id}-{description.key}"
-        self._attr_name = (f"{self.device.get('name', '')} {description.name}").lstrip()
+        self._attr_unique_id = spec.unique_id
+        self._attr_name = spec.name
 
     @property
     def is_on(self) -> bool | None:
@@ -119,22 +112,30 @@ class PlugwiseSwitchEntity(PlugwiseEntity, SwitchEntity):
     @plugwise_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the device on."""
-        await self.coordinator.api.set_switch_state(
-            self._dev_id,
-            self.device.get("members"),
-            self.entity_description.key,
-            "on",
-        )
+        with self.coordinator.optimistic_command(
+            self._dev_id, {"switches": {self.entity_description.key: True}}
+        ):
+            await self.coordinator.async_send_command(
+                self.coordinator.api.set_switch_state,
+                self._dev_id,
+                self.device.get("members"),
+                self.entity_description.key,
+                "on",
+            )
 
     @plugwise_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the device off."""
-        await self.coordinator.api.set_switch_state(
-            self._dev_id,
-            self.device.get("members"),
-            self.entity_description.key,
-            "off",
-        )
+        with self.coordinator.optimistic_command(
+            self._dev_id, {"switches": {self.entity_description.key: False}}
+        ):
+            await self.coordinator.async_send_command(
+                self.coordinator.api.set_switch_state,
+                self._dev_id,
+                self.device.get("members"),
+                self.entity_description.key,
+                "off",
+            )
 
 
 class USBSwitch(PlugwiseUSBEntity, SwitchEntity):
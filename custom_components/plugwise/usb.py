@@ -35,6 +35,7 @@ from .const import (
     USB_MOTION_ID,
     USB_RELAY_ID,
 )
+from .handoff import async_claim_api, usb_handoff_key
 from .models import PlugwiseEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
@@ -95,13 +96,20 @@ async def async_setup_entry_usb(hass: HomeAssistant, config_entry: ConfigEntry):
     def shutdown(event):
         hass.async_add_executor_job(api_stick.disconnect)
 
-    api_stick = Stick(config_entry.data[CONF_USB_PATH])
+    # The config flow hands over the stick it initialized moments ago
+    handoff_key = usb_handoff_key(config_entry.data[CONF_USB_PATH])
+    if (api_stick := async_claim_api(hass, handoff_key)) is None:
+        api_stick = Stick(config_entry.data[CONF_USB_PATH])
+        initialized = False
+    else:
+        initialized = True
     hass.data[DOMAIN][config_entry.entry_id] = {PW_TYPE: USB, STICK: api_stick}
     try:
-        _LOGGER.debug("Connect to USB-Stick")
-        await hass.async_add_executor_job(api_stick.connect)
-        _LOGGER.debug("Initialize USB-stick")
-        await hass.async_add_executor_job(api_stick.initialize_stick)
+        if not initialized:
+            _LOGGER.debug("Connect to USB-Stick")
+            await hass.async_add_executor_job(api_stick.connect)
+            _LOGGER.debug("Initialize USB-stick")
+            await hass.async_add_executor_job(api_stick.initialize_stick)
         _LOGGER.debug("Discover Circle+ node")
         await hass.async_add_executor_job(api_stick.initialize_circle_plus)
     except PortError:
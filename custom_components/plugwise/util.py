@@ -31,6 +31,7 @@ def plugwise_command(
                 f"Error communicating with API: {error}"
             ) from error
         finally:
+            self.coordinator.async_request_metadata_refresh()
             await self.coordinator.async_request_refresh()
 
     return handler
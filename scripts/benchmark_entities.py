@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Microbenchmark of the entity plan and the state properties of the entities.
+
+Run from the root of the repository, in the venv set up by core-testing.sh:
+
+    python scripts/benchmark_entities.py [fixture]
+
+The fixture defaults to adam_multiple_devices_per_zone.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+from timeit import repeat
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from homeassistant.const import Platform  # noqa: E402
+
+from custom_components.plugwise.binary_sensor import (  # noqa: E402
+    PlugwiseBinarySensorEntity,
+)
+from custom_components.plugwise.climate import PlugwiseClimateEntity  # noqa: E402
+from custom_components.plugwise.coordinator import PlugwiseData  # noqa: E402
+from custom_components.plugwise.models import COORDINATOR_SENSOR_TYPES  # noqa: E402
+from custom_components.plugwise.plan import build_entity_plan  # noqa: E402
+from custom_components.plugwise.sensor import PlugwiseSensorEnity  # noqa: E402
+from custom_components.plugwise.switch import PlugwiseSwitchEntity  # noqa: E402
+
+FIXTURES = ROOT / "tests" / "components" / "plugwise" / "fixtures"
+NUMBER = 200
+REPEAT = 5
+
+ENTITY_PROPERTIES = {
+    Platform.SENSOR: (PlugwiseSensorEnity, "native_value"),
+    Platform.BINARY_SENSOR: (PlugwiseBinarySensorEntity, "is_on"),
+    Platform.SWITCH: (PlugwiseSwitchEntity, "is_on"),
+}
+
+
+def best(stmt, number: int = NUMBER) -> float:
+    """Return the best time of a run in microseconds."""
+    return min(repeat(stmt, number=number, repeat=REPEAT)) / number * 1e6
+
+
+def main() -> None:
+    """Print the cost of planning and of reading the entity states."""
+    fixture = sys.argv[1] if len(sys.argv) > 1 else "adam_multiple_devices_per_zone"
+    gateway, devices = json.loads(
+        (FIXTURES / fixture / "all_data.json").read_text(encoding="utf-8")
+    )
+    coordinator = SimpleNamespace(
+        data=PlugwiseData(gateway, devices),
+        async_device_info=lambda device_id: None,
+    )
+
+    plan = build_entity_plan(devices)
+    print(f"{fixture}: {sum(map(len, plan.specs.values()))} entities")
+    print(f"  plan                  {best(lambda: build_entity_plan(devices)):8.2f} us")
+
+    for platform, (entity_class, prop) in ENTITY_PROPERTIES.items():
+        entities = [
+            entity_class(coordinator, spec)
+            for spec in plan.specs[platform]
+            if spec.description not in COORDINATOR_SENSOR_TYPES
+        ]
+        if not entities:
+            continue
+        getter = getattr(entity_class, prop).fget
+
+        def read(entities=entities, getter=getter):
+            for entity in entities:
+                getter(entity)
+
+        print(
+            f"  {platform.value:<13} {prop:<12}"
+            f"{best(read) / len(entities):8.3f} us/entity"
+        )
+
+    climates = [
+        PlugwiseClimateEntity(coordinator, spec)
+        for spec in plan.specs[Platform.CLIMATE]
+    ]
+    if climates:
+
+        def hvac_action():
+            for entity in climates:
+                entity.hvac_action
+
+        print(
+            f"  {'climate':<13} {'hvac_action':<12}"
+            f"{best(hvac_action) / len(climates):8.3f} us/entity"
+        )
+
+
+if __name__ == "__main__":
+    main()
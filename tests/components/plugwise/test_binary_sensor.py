@@ -1,14 +1,17 @@
 """Tests for the Plugwise binary_sensor integration."""
 
-from unittest.mock import MagicMock
+from copy import deepcopy
+from unittest.mock import MagicMock, patch
 
+from homeassistant.components.plugwise.const import COORDINATOR, DOMAIN
 from homeassistant.const import STATE_OFF, STATE_ON
 from homeassistant.core import HomeAssistant
-
-# from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import entity_registry as er
 
 from tests.common import MockConfigEntry
 
+NOTIFICATION_ID = "af82e4ccf9c548528166d38e560662a4"
+
 
 async def test_anna_climate_binary_sensor_entities(
     hass: HomeAssistant, mock_smile_anna: MagicMock, init_integration: MockConfigEntry
@@ -72,11 +75,76 @@ async def test_adam_climate_binary_sensor_change(
     # Test disabled_by default entry
     assert hass.states.get(entity_id) is None
 
-    # # 20220213 TODO: same as above
-    # #state = hass.states.get(entity_id)
-    # #assert state
-    # #assert state.state == STATE_ON
-    # #assert "warning_msg" in state.attributes
-    # #assert "unreachable" in state.attributes["warning_msg"][0]
-    # #assert not state.attributes.get("error_msg")
-    # #assert not state.attributes.get("other_msg")
+    registry = er.async_get(hass)
+    registry.async_update_entity(entity_id, disabled_by=None)
+    await hass.config_entries.async_reload(init_integration.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state
+    assert state.state == STATE_ON
+    assert "warning_msg" in state.attributes
+    assert "unreachable" in state.attributes["warning_msg"][0]
+    assert not state.attributes.get("error_msg")
+    assert not state.attributes.get("other_msg")
+
+
+async def test_adam_notifications_created_once(
+    hass: HomeAssistant, mock_smile_adam: MagicMock, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test notifications are created once and dismissed when resolved."""
+    mock_config_entry.add_to_hass(hass)
+    with patch(
+        "homeassistant.components.persistent_notification.async_create"
+    ) as mock_create, patch(
+        "homeassistant.components.persistent_notification.async_dismiss"
+    ) as mock_dismiss:
+        await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][mock_config_entry.entry_id][COORDINATOR]
+        await coordinator.async_refresh()
+        await coordinator.async_refresh()
+
+        assert len(mock_create.mock_calls) == 1
+        assert mock_create.call_args.args[-1] == f"{DOMAIN}.{NOTIFICATION_ID}"
+        assert not mock_dismiss.mock_calls
+
+        gateway, devices = deepcopy(mock_smile_adam.async_update.return_value)
+        gateway["notifications"] = {}
+        mock_smile_adam.async_update.return_value = [gateway, devices]
+        await coordinator.async_refresh()
+        await coordinator.async_refresh()
+
+    assert len(mock_create.mock_calls) == 1
+    assert len(mock_dismiss.mock_calls) == 1
+    assert mock_dismiss.call_args.args[-1] == f"{DOMAIN}.{NOTIFICATION_ID}"
+    assert coordinator.notification_attrs == {
+        "other_msg": [],
+        "info_msg": [],
+        "warning_msg": [],
+        "error_msg": [],
+    }
+
+
+async def test_adam_notification_attributes(
+    hass: HomeAssistant, mock_smile_adam: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test notification messages are grouped by severity."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    gateway, devices = deepcopy(mock_smile_adam.async_update.return_value)
+    gateway["notifications"] = {
+        "1": {"warning": "Plug unreachable"},
+        "2": {"Error": "Boiler failure"},
+        "3": {"info": "Firmware updated"},
+        "4": {"message": "Unknown type"},
+        "5": {"warning": "Battery low"},
+    }
+    mock_smile_adam.async_update.return_value = [gateway, devices]
+    await coordinator.async_refresh()
+
+    assert coordinator.notification_attrs == {
+        "other_msg": ["Unknown type"],
+        "info_msg": ["Firmware updated"],
+        "warning_msg": ["Plug unreachable", "Battery low"],
+        "error_msg": ["Boiler failure"],
+    }
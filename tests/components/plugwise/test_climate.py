@@ -1,5 +1,7 @@
 """Tests for the Plugwise Climate integration."""
 
+import asyncio
+from copy import deepcopy
 from unittest.mock import MagicMock
 
 from plugwise.exceptions import PlugwiseException
@@ -11,10 +13,11 @@ from homeassistant.components.climate.const import (
     HVAC_MODE_HEAT,
     HVAC_MODE_OFF,
 )
+from homeassistant.components.plugwise.const import COORDINATOR, DOMAIN
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 
-from tests.common import MockConfigEntry
+from tests.common import MockConfigEntry, async_capture_events
 
 
 async def test_adam_climate_entity_attributes(
@@ -146,6 +149,86 @@ async def test_adam_climate_entity_climate_changes(
     )
 
 
+async def test_adam_set_zones_service(
+    hass: HomeAssistant, mock_smile_adam: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test setting several zones at once refreshes the gateway once."""
+    events = async_capture_events(hass, "plugwise_set_zones_result")
+    updates = len(mock_smile_adam.async_update.mock_calls)
+
+    await hass.services.async_call(
+        "plugwise",
+        "set_zones",
+        {
+            "entity_id": "climate.zone_lisa_wk",
+            "locations": ["82fa13f017d240daa0d0ea1775420f24"],
+            "preset_mode": "away",
+        },
+        blocking=True,
+    )
+
+    assert mock_smile_adam.set_preset.call_count == 2
+    assert len(mock_smile_adam.async_update.mock_calls) == updates + 1
+    results = events[0].data["results"]
+    assert results["climate.zone_lisa_wk"]["success"]
+    assert results["82fa13f017d240daa0d0ea1775420f24"]["success"]
+
+    mock_smile_adam.set_temperature.side_effect = PlugwiseException
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            "plugwise",
+            "set_zones",
+            {"entity_id": "climate.zone_lisa_wk", "temperature": 19},
+            blocking=True,
+        )
+    assert not events[1].data["results"]["climate.zone_lisa_wk"]["success"]
+
+
+async def test_adam_set_zones_service_deduplicates_zones(
+    hass: HomeAssistant, mock_smile_adam: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test a zone requested by its entity and its location is set once."""
+    events = async_capture_events(hass, "plugwise_set_zones_result")
+
+    await hass.services.async_call(
+        "plugwise",
+        "set_zones",
+        {
+            "entity_id": "climate.zone_lisa_wk",
+            "locations": ["c50f167537524366a5af7aa3942feb1e"],
+            "temperature": 21,
+        },
+        blocking=True,
+    )
+
+    mock_smile_adam.set_temperature.assert_called_once_with(
+        "c50f167537524366a5af7aa3942feb1e", 21
+    )
+    results = events[0].data["results"]
+    assert results["climate.zone_lisa_wk"]["success"]
+    assert results["c50f167537524366a5af7aa3942feb1e"]["success"]
+
+
+async def test_adam_set_zones_service_unavailable_zone(
+    hass: HomeAssistant, mock_smile_adam: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test a zone whose thermostat left the data is rejected."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    gateway, devices = deepcopy(mock_smile_adam.async_update.return_value)
+    del devices["b59bcebaf94b499ea7d46e4a66fb62d8"]
+    mock_smile_adam.async_update.return_value = [gateway, devices]
+    await coordinator.async_refresh()
+
+    with pytest.raises(HomeAssistantError, match="is not available"):
+        await hass.services.async_call(
+            "plugwise",
+            "set_zones",
+            {"entity_id": "climate.zone_lisa_wk", "temperature": 21},
+            blocking=True,
+        )
+    assert mock_smile_adam.set_temperature.call_count == 0
+
+
 async def test_anna_climate_entity_attributes(
     hass: HomeAssistant, mock_smile_anna: MagicMock, init_integration: MockConfigEntry
 ) -> None:
@@ -220,3 +303,58 @@ async def test_anna_climate_entity_climate_changes(
 
     assert mock_smile_anna.set_temperature.call_count == 1
     assert mock_smile_anna.set_schedule_state.call_count == 1
+
+
+async def test_anna_climate_entity_coalesces_setpoints(
+    hass: HomeAssistant, mock_smile_anna: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test rapid setpoint requests for a zone result in one request."""
+    await asyncio.gather(
+        *(
+            hass.services.async_call(
+                "climate",
+                "set_temperature",
+                {"entity_id": "climate.anna", "temperature": temperature},
+                blocking=True,
+            )
+            for temperature in (20, 20.5, 21)
+        )
+    )
+
+    assert mock_smile_anna.set_temperature.call_count == 1
+    mock_smile_anna.set_temperature.assert_called_with(
+        "c784ee9fdab44e1395b8dee7d7a497d5", 21.0
+    )
+
+
+async def test_anna_climate_entity_rolls_back_failed_setpoints(
+    hass: HomeAssistant, mock_smile_anna: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test a failed coalesced setpoint only rolls back the setpoint, once."""
+    await hass.services.async_call(
+        "climate",
+        "set_preset_mode",
+        {"entity_id": "climate.anna", "preset_mode": "away"},
+        blocking=True,
+    )
+    mock_smile_anna.set_temperature.side_effect = PlugwiseException
+
+    results = await asyncio.gather(
+        *(
+            hass.services.async_call(
+                "climate",
+                "set_temperature",
+                {"entity_id": "climate.anna", "temperature": temperature},
+                blocking=True,
+            )
+            for temperature in (20, 20.5)
+        ),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, HomeAssistantError) for result in results)
+    assert mock_smile_anna.set_temperature.call_count == 1
+    state = hass.states.get("climate.anna")
+    assert state.attributes["temperature"] == 21.0
+    # The preset is still pending, the gateway has not reported it yet
+    assert state.attributes["preset_mode"] == "away"
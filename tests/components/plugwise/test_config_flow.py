@@ -13,9 +13,16 @@ import pytest
 import serial.tools.list_ports
 
 from homeassistant.components.plugwise.config_flow import CONF_MANUAL_PATH
+from homeassistant.components.plugwise.handoff import (
+    async_claim_api,
+    gateway_handoff_key,
+)
 from homeassistant.components import zeroconf
 from homeassistant.components.plugwise.const import (
     API,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_STALE_TTL,
     CONF_USB_PATH,
     DEFAULT_PORT,
     DOMAIN,
@@ -32,6 +39,7 @@ from homeassistant.const import (
     CONF_NAME,
     CONF_PASSWORD,
     CONF_PORT,
+    CONF_SCAN_INTERVAL,
     CONF_SOURCE,
     CONF_USERNAME,
 )
@@ -186,6 +194,10 @@ async def test_form(
 
     assert len(mock_setup_entry.mock_calls) == 1
     assert len(mock_smile_config_flow.connect.mock_calls) == 1
+    # The connected Smile is handed over to the entry setup
+    assert async_claim_api(hass, gateway_handoff_key(result2["data"])) is (
+        mock_smile_config_flow
+    )
 
 
 @pytest.mark.parametrize(
@@ -649,3 +661,63 @@ async def test_options_flow_stick_with_input(hass) -> None:
 
         assert result["type"] == RESULT_TYPE_CREATE_ENTRY
         assert result["title"] == ""
+
+
+async def test_options_flow_gateway(
+    hass: HomeAssistant, mock_smile_anna: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test the scan interval bounds default to the scan interval."""
+    result = await hass.config_entries.options.async_init(init_integration.entry_id)
+    assert result["type"] == RESULT_TYPE_FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={}
+    )
+    assert result["type"] == RESULT_TYPE_CREATE_ENTRY
+    assert result["data"] == {
+        CONF_SCAN_INTERVAL: 60,
+        CONF_MIN_SCAN_INTERVAL: 60,
+        CONF_MAX_SCAN_INTERVAL: 60,
+        CONF_STALE_TTL: 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "user_input,error",
+    [
+        (
+            {CONF_MIN_SCAN_INTERVAL: 300, CONF_MAX_SCAN_INTERVAL: 60},
+            "min_above_max",
+        ),
+        (
+            {CONF_SCAN_INTERVAL: 30, CONF_MAX_SCAN_INTERVAL: 300},
+            "scan_interval_out_of_bounds",
+        ),
+    ],
+)
+async def test_options_flow_gateway_invalid_bounds(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+    user_input: dict[str, int],
+    error: str,
+) -> None:
+    """Test the options flow rejects scan intervals outside the bounds."""
+    result = await hass.config_entries.options.async_init(init_integration.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=user_input
+    )
+    assert result["type"] == RESULT_TYPE_FORM
+    assert result["errors"] == {"base": error}
+
+
+async def test_options_flow_gateway_rejects_zero_interval(
+    hass: HomeAssistant, mock_smile_anna: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test the options flow rejects a scan interval below the minimum."""
+    result = await hass.config_entries.options.async_init(init_integration.entry_id)
+    with pytest.raises(MultipleInvalid):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input={CONF_MIN_SCAN_INTERVAL: 0}
+        )
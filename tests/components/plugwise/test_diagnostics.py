@@ -16,9 +16,15 @@ async def test_diagnostics(
     init_integration: MockConfigEntry,
 ) -> None:
     """Test diagnostics."""
-    assert await get_diagnostics_for_config_entry(
+    diagnostics = await get_diagnostics_for_config_entry(
         hass, hass_client, init_integration
-    ) == {
+    )
+
+    coordinator = diagnostics.pop("coordinator")
+    assert coordinator["state_writes"]["emitted"] > 0
+    assert coordinator["state_writes"]["suppressed"] >= 0
+
+    assert diagnostics == {
         "gateway": {
             "smile_name": "Adam",
             "gateway_id": "fe799307f1624099878210aa0b9f1475",
@@ -1,17 +1,42 @@
 """Tests for the Plugwise Climate integration."""
 import asyncio
-from unittest.mock import MagicMock
+from copy import deepcopy
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock, patch
 
 from plugwise.exceptions import (
     ConnectionFailedError,
+    InvalidAuthentication,
     PlugwiseException,
     XMLDataMissingError,
 )
 import pytest
 
-from homeassistant.components.plugwise.const import DOMAIN
+from homeassistant.components.plugwise.const import (
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    COORDINATOR,
+    DOMAIN,
+    LANE_POLL,
+)
+from homeassistant.components.plugwise.handoff import (
+    async_offer_api,
+    gateway_handoff_key,
+)
+from homeassistant.components.plugwise.select import PlugwiseSelectEntity
+from homeassistant.components.plugwise.sensor import PlugwiseSensorEnity
 from homeassistant.config_entries import ConfigEntryState
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    ATTR_ASSUMED_STATE,
+    CONF_SCAN_INTERVAL,
+    EVENT_HOMEASSISTANT_STARTED,
+    STATE_UNAVAILABLE,
+    Platform,
+)
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import Entity
 
 from tests.common import MockConfigEntry
 
@@ -60,3 +85,706 @@ async def test_config_entry_not_ready(
 
     assert len(mock_smile_anna.connect.mock_calls) == 1
     assert mock_config_entry.state is ConfigEntryState.SETUP_RETRY
+
+
+async def test_coordinator_updates_changed_devices_only(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test only entities of devices with changed data are updated."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    gateway, devices = deepcopy(mock_smile_anna.async_update.return_value)
+    devices["3cb70739631c4d17a86b8b12e8a5161b"]["sensors"]["illuminance"] = 90.0
+    mock_smile_anna.async_update.return_value = [gateway, devices]
+
+    with patch.object(
+        PlugwiseSensorEnity, "async_write_ha_state", autospec=True
+    ) as mock_write:
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    written = {call.args[0].entity_id for call in mock_write.mock_calls}
+    assert "sensor.anna_illuminance" in written
+    assert "sensor.opentherm_outdoor_temperature" not in written
+
+
+async def test_coordinator_detects_removed_live_keys(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test a live value the gateway stops reporting changes the device."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    gateway, devices = deepcopy(mock_smile_anna.async_update.return_value)
+    del devices["1cbf783bb11e4a7c8a6843dee3a86927"]["compressor_state"]
+    mock_smile_anna.async_update.return_value = [gateway, devices]
+
+    await coordinator.async_refresh()
+
+    heater = coordinator.data.devices["1cbf783bb11e4a7c8a6843dee3a86927"]
+    assert "compressor_state" not in heater
+    assert heater["model"] == devices["1cbf783bb11e4a7c8a6843dee3a86927"]["model"]
+
+
+async def test_coordinator_skips_unchanged_state_writes(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test entities only write their state when state or attributes changed."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    suppressed = coordinator.state_writes["suppressed"]
+
+    with patch.object(Entity, "async_write_ha_state", autospec=True) as mock_write:
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert not mock_write.mock_calls
+    assert coordinator.state_writes["suppressed"] > suppressed
+
+    # Select options are capability attributes, changing them writes the state
+    gateway, devices = deepcopy(mock_smile_anna.async_update.return_value)
+    devices["3cb70739631c4d17a86b8b12e8a5161b"]["available_schedules"].append(
+        "Vacation"
+    )
+    mock_smile_anna.async_update.return_value = [gateway, devices]
+    coordinator.async_request_metadata_refresh()
+    with patch.object(Entity, "async_write_ha_state", autospec=True) as mock_write:
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert any(
+        isinstance(call.args[0], PlugwiseSelectEntity) for call in mock_write.mock_calls
+    )
+
+
+async def test_coordinator_fixed_update_interval(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test the scan interval is not adapted without bounds in the options."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    for _ in range(4):
+        await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=60)
+
+
+async def test_coordinator_adaptive_update_interval(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_smile_anna: MagicMock,
+) -> None:
+    """Test the scan interval is stretched while the data does not change."""
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        mock_config_entry,
+        options={
+            CONF_SCAN_INTERVAL: 60,
+            CONF_MIN_SCAN_INTERVAL: 60,
+            CONF_MAX_SCAN_INTERVAL: 300,
+        },
+    )
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id][COORDINATOR]
+    assert coordinator.update_interval == timedelta(seconds=60)
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=90)
+
+    # Follow-up refreshes after commands are left out
+    gateway, devices = deepcopy(mock_smile_anna.async_update.return_value)
+    sensors = devices["3cb70739631c4d17a86b8b12e8a5161b"]["sensors"]
+    with patch("homeassistant.components.plugwise.coordinator.REFRESH_COOLDOWN", 0):
+        for temperature in (19.5, 19.7):
+            sensors["temperature"] = temperature
+            mock_smile_anna.async_update.return_value = [gateway, deepcopy(devices)]
+            await coordinator.async_schedule_refresh()
+    assert coordinator.update_interval == timedelta(seconds=90)
+
+    # Down to the minimum scan interval
+    for temperature in (19.9, 20.1, 20.3, 20.5):
+        sensors["temperature"] = temperature
+        mock_smile_anna.async_update.return_value = [gateway, deepcopy(devices)]
+        await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=60)
+
+
+async def test_coordinator_serves_stale_data(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test the last good data is served within the stale TTL."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    coordinator.stale_ttl = timedelta(minutes=5)
+    mock_smile_anna.async_update.side_effect = PlugwiseException
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.last_update_success
+    assert coordinator.stale_age is not None
+    assert hass.states.get("sensor.anna_illuminance").state != STATE_UNAVAILABLE
+    state = hass.states.get("sensor.anna_connection_state")
+    assert state.attributes["stale_age"] is not None
+
+    coordinator.stale_ttl = timedelta(0)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert not coordinator.last_update_success
+    assert hass.states.get("sensor.anna_illuminance").state == STATE_UNAVAILABLE
+    state = hass.states.get("sensor.anna_connection_state")
+    assert state.attributes["stale_age"] is None
+
+
+async def test_coordinator_circuit_breaker(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test the coordinator backs off from a failing gateway."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    assert hass.states.get("sensor.anna_connection_state").state == "closed"
+
+    mock_smile_anna.async_update.side_effect = PlugwiseException
+    for _ in range(3):
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.circuit_state == "open"
+    assert coordinator.update_interval > timedelta(seconds=60)
+    assert len(mock_smile_anna.async_update.mock_calls) == 4
+
+    # The gateway is not polled while the circuit is open
+    await coordinator.async_refresh()
+    assert len(mock_smile_anna.async_update.mock_calls) == 4
+
+    state = hass.states.get("sensor.anna_connection_state")
+    assert state.state == "open"
+    assert state.attributes["consecutive_failures"] == 3
+
+
+async def test_coordinator_single_flight_refresh(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test concurrent refreshes share fetches from the gateway."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    data = mock_smile_anna.async_update.return_value
+
+    async def slow_update():
+        await asyncio.sleep(0.1)
+        return data
+
+    mock_smile_anna.async_update.side_effect = slow_update
+    calls = len(mock_smile_anna.async_update.mock_calls)
+
+    # A refresh while a fetch is in flight joins that fetch
+    await asyncio.gather(coordinator.async_refresh(), coordinator.async_refresh())
+    assert len(mock_smile_anna.async_update.mock_calls) == calls + 1
+
+    # Requests during a fetch share exactly one follow-up fetch
+    with patch("homeassistant.components.plugwise.coordinator.REFRESH_COOLDOWN", 0):
+        refresh = hass.async_create_task(coordinator.async_refresh())
+        await asyncio.sleep(0)
+        await asyncio.gather(
+            coordinator.async_schedule_refresh(),
+            coordinator.async_schedule_refresh(),
+        )
+        await refresh
+    assert len(mock_smile_anna.async_update.mock_calls) == calls + 3
+
+
+async def test_coordinator_converges_after_command(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test the coordinator re-polls until a command is reported applied."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    gateway, devices = deepcopy(mock_smile_anna.async_update.return_value)
+    applied = deepcopy(devices)
+    applied["3cb70739631c4d17a86b8b12e8a5161b"]["sensors"]["setpoint"] = 22
+    mock_smile_anna.async_update.side_effect = [
+        [gateway, devices],
+        [gateway, applied],
+    ]
+
+    with patch("homeassistant.components.plugwise.coordinator.REFRESH_COOLDOWN", 0):
+        await hass.services.async_call(
+            "climate",
+            "set_temperature",
+            {"entity_id": "climate.anna", "temperature": 22},
+            blocking=True,
+        )
+        # Not applied yet, the optimistic value is shown while re-polling
+        assert hass.states.get("climate.anna").attributes["temperature"] == 22
+        await hass.async_block_till_done()
+
+    assert len(mock_smile_anna.async_update.mock_calls) == 3
+    assert hass.states.get("climate.anna").attributes["temperature"] == 22
+    assert coordinator.optimistic.convergence["setpoint"].stats["samples"] == 1
+
+
+async def test_command_does_not_wait_for_refresh(
+    hass: HomeAssistant,
+    mock_smile_adam: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test a command returns once sent, the follow-up refresh comes later."""
+    gateway, devices = deepcopy(mock_smile_adam.async_update.return_value)
+    devices["78d1126fc4c743db81b61c20e88342a7"]["switches"]["relay"] = False
+    mock_smile_adam.async_update.return_value = [gateway, devices]
+    calls = len(mock_smile_adam.async_update.mock_calls)
+    await hass.services.async_call(
+        "switch",
+        "turn_off",
+        {"entity_id": "switch.cv_pomp_relay"},
+        blocking=True,
+    )
+    assert mock_smile_adam.set_switch_state.call_count == 1
+    assert len(mock_smile_adam.async_update.mock_calls) == calls
+
+    await hass.async_block_till_done()
+    assert len(mock_smile_adam.async_update.mock_calls) == calls + 1
+    assert hass.states.get("switch.cv_pomp_relay").state == "off"
+
+
+async def test_coordinator_fetch_time_excludes_queue_wait(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test the fetch timer leaves out the wait behind queued commands."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+
+    async def command():
+        await asyncio.sleep(0.2)
+
+    sent = hass.async_create_task(coordinator.async_send_command(command))
+    await asyncio.sleep(0)
+    await coordinator.async_refresh()
+    await sent
+
+    assert coordinator.scheduler.wait_times[LANE_POLL].percentile(1) >= 150
+    assert coordinator.timers["fetch"].percentile(1) < 150
+
+
+async def test_unload_cancels_scheduled_work(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test unloading cancels follow-up refreshes and coalesced commands."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    calls = len(mock_smile_anna.async_update.mock_calls)
+
+    follow_up = coordinator.async_schedule_refresh()
+    command = hass.async_create_task(
+        coordinator.coalescer.async_submit(
+            ("setpoint", "zone"), mock_smile_anna.set_temperature
+        )
+    )
+    await asyncio.sleep(0)
+    await hass.config_entries.async_unload(init_integration.entry_id)
+    await asyncio.gather(follow_up, command, return_exceptions=True)
+    await asyncio.sleep(coordinator.coalescer.window)
+    await hass.async_block_till_done()
+
+    assert command.cancelled()
+    assert len(mock_smile_anna.async_update.mock_calls) == calls
+    assert mock_smile_anna.set_temperature.call_count == 0
+    # Nothing is scheduled after shutdown
+    await coordinator.async_request_refresh()
+    assert len(mock_smile_anna.async_update.mock_calls) == calls
+
+
+async def test_coordinator_commands_before_polls(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test queued commands are sent before a queued poll."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    data = mock_smile_anna.async_update.return_value
+    sent = []
+
+    async def command(name):
+        await asyncio.sleep(0.05)
+        sent.append(name)
+
+    async def update():
+        sent.append("poll")
+        return data
+
+    mock_smile_anna.async_update.side_effect = update
+    first = hass.async_create_task(coordinator.async_send_command(command, "first"))
+    await asyncio.sleep(0)
+    poll = hass.async_create_task(coordinator.async_refresh())
+    await asyncio.sleep(0)
+    second = hass.async_create_task(coordinator.async_send_command(command, "second"))
+    await asyncio.gather(first, poll, second)
+
+    assert sent == ["first", "second", "poll"]
+    assert coordinator.scheduler.stats["max_queue_depth"] == 2
+
+
+async def test_slow_topology_warning(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_smile_anna: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test a warning is logged when building the topology is slow."""
+    mock_config_entry.add_to_hass(hass)
+    with patch("homeassistant.components.plugwise.coordinator.TOPOLOGY_BUDGET", -1):
+        await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    assert len(mock_smile_anna.get_all_devices.mock_calls) == 1
+    assert "Building the device topology of" in caplog.text
+
+
+async def test_setup_from_cached_topology(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_smile_anna: MagicMock,
+) -> None:
+    """Test entities are created from the cache while the Smile is offline."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    await hass.config_entries.async_unload(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    mock_smile_anna.connect.side_effect = ConnectionFailedError
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("climate.anna").state == STATE_UNAVAILABLE
+    assert hass.states.get("sensor.anna_illuminance").state == STATE_UNAVAILABLE
+
+    # The coordinator connects once the Smile can be reached
+    mock_smile_anna.connect.side_effect = None
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id][COORDINATOR]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.connected
+    assert hass.states.get("climate.anna").state != STATE_UNAVAILABLE
+    assert hass.states.get("sensor.anna_illuminance").state != STATE_UNAVAILABLE
+
+
+async def test_cached_setup_invalid_authentication(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_smile_anna: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test wrong credentials stop polling when set up from the cache."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    await hass.config_entries.async_unload(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    mock_smile_anna.connect.side_effect = InvalidAuthentication
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id][COORDINATOR]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert "Invalid username or Smile ID" in caplog.text
+    assert coordinator.update_interval is None
+    assert not coordinator.last_update_success
+    assert hass.states.get("climate.anna").state == STATE_UNAVAILABLE
+
+
+async def test_remove_entry_removes_cache(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    mock_config_entry: MockConfigEntry,
+    mock_smile_anna: MagicMock,
+) -> None:
+    """Test the cached topology is removed with the config entry."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert f"{DOMAIN}.{mock_config_entry.entry_id}" in hass_storage
+
+    await hass.config_entries.async_remove(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert f"{DOMAIN}.{mock_config_entry.entry_id}" not in hass_storage
+
+
+async def test_restore_state_until_started(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_smile_anna: MagicMock,
+) -> None:
+    """Test the cached state is shown until the refresh after startup."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    await hass.config_entries.async_unload(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.state = CoreState.starting
+    connects = len(mock_smile_anna.connect.mock_calls)
+    updates = len(mock_smile_anna.async_update.mock_calls)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    assert len(mock_smile_anna.connect.mock_calls) == connects
+    assert len(mock_smile_anna.async_update.mock_calls) == updates
+    state = hass.states.get("climate.anna")
+    assert state.attributes["temperature"] == 21
+    assert state.attributes[ATTR_ASSUMED_STATE]
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    assert len(mock_smile_anna.connect.mock_calls) == connects + 1
+    assert len(mock_smile_anna.async_update.mock_calls) == updates + 1
+    state = hass.states.get("climate.anna")
+    assert ATTR_ASSUMED_STATE not in state.attributes
+
+
+async def test_setup_adopts_config_flow_connection(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_smile_anna: MagicMock,
+) -> None:
+    """Test setup reuses the Smile connected by the config flow."""
+    async_offer_api(hass, gateway_handoff_key(mock_config_entry.data), mock_smile_anna)
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    assert len(mock_smile_anna.connect.mock_calls) == 0
+    assert len(mock_smile_anna.get_all_devices.mock_calls) == 1
+    assert not hass.data["plugwise_handoff"]
+
+
+async def test_entity_plan(
+    hass: HomeAssistant,
+    mock_smile_adam: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test the platforms create the entities of the plan of the snapshot."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    plan = coordinator.entity_plan
+    assert coordinator.entity_plan is plan
+
+    registry = er.async_get(hass)
+    for platform, specs in plan.specs.items():
+        for spec in specs:
+            assert registry.async_get_entity_id(platform, DOMAIN, spec.unique_id)
+
+    thermostats = [spec.device_id for spec in plan.specs[Platform.CLIMATE]]
+    assert thermostats == [spec.device_id for spec in plan.specs[Platform.SELECT]]
+    assert len(thermostats) == 5
+
+    # The coordinator sensors belong to the gateway device
+    gateway_id = coordinator.data.gateway["gateway_id"]
+    assert f"{gateway_id}-circuit_state" in {
+        spec.unique_id for spec in plan.specs[Platform.SENSOR]
+    }
+    assert hass.states.get("sensor.adam_connection_state").state == "closed"
+
+
+async def test_device_info_shared_until_metadata_changes(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test entities share the device info, metadata changes reach the registry."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    device_id = "3cb70739631c4d17a86b8b12e8a5161b"
+    device_info = coordinator.async_device_info(device_id)
+    assert coordinator.async_device_info(device_id) is device_info
+
+    gateway, devices = deepcopy(mock_smile_anna.async_update.return_value)
+    devices[device_id]["fw"] = "2022-03-01T10:00:00+01:00"
+    mock_smile_anna.async_update.return_value = [gateway, devices]
+    coordinator.async_request_metadata_refresh()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.async_device_info(device_id) is not device_info
+    device = dr.async_get(hass).async_get_device({(DOMAIN, device_id)})
+    assert device.sw_version == "2022-03-01T10:00:00+01:00"
+
+
+async def test_disabled_entities_left_out(
+    hass: HomeAssistant,
+    mock_smile_anna: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test disabled entities are only planned, their values do not update."""
+    device_id = "3cb70739631c4d17a86b8b12e8a5161b"
+    registry = er.async_get(hass)
+    registry.async_update_entity(
+        "sensor.anna_illuminance", disabled_by=er.RegistryEntryDisabler.USER
+    )
+    await hass.config_entries.async_reload(init_integration.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    plan = coordinator.entity_plan
+    assert f"{device_id}-illuminance" in {
+        spec.unique_id for spec in plan.disabled[Platform.SENSOR]
+    }
+    assert plan.unused_keys[device_id]["sensors"] == {"illuminance"}
+    assert hass.states.get("sensor.anna_illuminance") is None
+
+    device = coordinator.data.devices[device_id]
+    gateway, devices = deepcopy(mock_smile_anna.async_update.return_value)
+    devices[device_id]["sensors"]["illuminance"] = 90.0
+    mock_smile_anna.async_update.return_value = [gateway, devices]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.data.devices[device_id] is device
+
+
+SMILE_ATTRIBUTES = (
+    "gateway_id",
+    "heater_id",
+    "notifications",
+    "smile_hostname",
+    "smile_name",
+    "smile_type",
+    "smile_version",
+)
+
+
+async def async_rebuild_topology(
+    hass: HomeAssistant, smile: MagicMock, data: list[Any]
+) -> MagicMock:
+    """Rebuild the topology from a new connection to the Smile, return it.
+
+    A connected Smile keeps reporting the devices it found when connecting,
+    only a new connection reports the devices in data.
+    """
+    coordinator = hass.data[DOMAIN][
+        hass.config_entries.async_entries(DOMAIN)[0].entry_id
+    ][COORDINATOR]
+    with patch(
+        "homeassistant.components.plugwise.gateway.Smile", autospec=True
+    ) as smile_class:
+        new_smile = smile_class.return_value
+        for attribute in SMILE_ATTRIBUTES:
+            setattr(new_smile, attribute, getattr(smile, attribute))
+        new_smile.connect.return_value = True
+        new_smile.async_update.return_value = deepcopy(data)
+        coordinator.async_request_topology_refresh()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert coordinator.api is new_smile
+    assert len(new_smile.connect.mock_calls) == 1
+    assert len(new_smile.get_all_devices.mock_calls) == 1
+    return new_smile
+
+
+async def test_topology_change_without_reload(
+    hass: HomeAssistant,
+    mock_smile_adam: MagicMock,
+    init_integration: MockConfigEntry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test entities of devices leaving and joining are removed and added."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    device_id = "21f2b542c49845e6bb416884c55778d6"
+    entity_id = "sensor.playstation_smart_plug_electricity_consumed"
+    assert hass.states.get(entity_id)
+
+    # The connected Smile keeps reporting the plug that left
+    gateway, devices = deepcopy(mock_smile_adam.async_update.return_value)
+    plug = devices.pop(device_id)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state != STATE_UNAVAILABLE
+
+    # Missing from one topology rebuild only makes the entities unavailable
+    with patch("homeassistant.components.plugwise.coordinator.TOPOLOGY_BUDGET", -1):
+        smile = await async_rebuild_topology(hass, mock_smile_adam, [gateway, devices])
+    assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
+    assert dr.async_get(hass).async_get_device({(DOMAIN, device_id)})
+    assert "Building the device topology of" not in caplog.text
+
+    smile = await async_rebuild_topology(hass, smile, [gateway, devices])
+    assert hass.states.get(entity_id) is None
+    assert dr.async_get(hass).async_get_device({(DOMAIN, device_id)}) is None
+    assert hass.states.get("climate.zone_lisa_wk").state != STATE_UNAVAILABLE
+
+    # The plug returns and the router loses its lock switch, the connected
+    # Smile only reports what it found when connecting
+    registry = er.async_get(hass)
+    router_id = "675416a629f343c495449970e2ca37b5"
+    assert registry.async_get_entity_id(Platform.SWITCH, DOMAIN, f"{router_id}-lock")
+    devices[device_id] = plug
+    del devices[router_id]["switches"]["lock"]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id) is None
+
+    smile = await async_rebuild_topology(hass, smile, [gateway, devices])
+    assert hass.states.get(entity_id)
+    assert hass.states.get("switch.playstation_smart_plug_relay")
+    assert registry.async_get_entity_id(Platform.SWITCH, DOMAIN, f"{router_id}-lock")
+
+    await async_rebuild_topology(hass, smile, [gateway, devices])
+    assert not registry.async_get_entity_id(
+        Platform.SWITCH, DOMAIN, f"{router_id}-lock"
+    )
+    assert len(mock_smile_adam.connect.mock_calls) == 1
+
+
+async def test_topology_absence_not_confirmed(
+    hass: HomeAssistant,
+    mock_smile_adam: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test a device back before the absence is confirmed keeps its entities."""
+    device_id = "21f2b542c49845e6bb416884c55778d6"
+    entity_id = "sensor.playstation_smart_plug_electricity_consumed"
+    registry = er.async_get(hass)
+    registry.async_update_entity(entity_id, name="Console power")
+
+    data = mock_smile_adam.async_update.return_value
+    gateway, devices = deepcopy(data)
+    del devices[device_id]
+    smile = await async_rebuild_topology(hass, mock_smile_adam, [gateway, devices])
+    assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
+
+    smile = await async_rebuild_topology(hass, smile, data)
+    await async_rebuild_topology(hass, smile, data)
+    assert hass.states.get(entity_id).state != STATE_UNAVAILABLE
+    assert registry.async_get(entity_id).name == "Console power"
+
+
+async def test_topology_not_rebuilt_for_p1(
+    hass: HomeAssistant,
+    mock_smile_p1: MagicMock,
+    init_integration: MockConfigEntry,
+) -> None:
+    """Test the fixed topology of a P1 is not rebuilt."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    coordinator.async_request_topology_refresh()
+    await coordinator.async_refresh()
+
+    assert coordinator.api is mock_smile_p1
+    assert len(mock_smile_p1.connect.mock_calls) == 1
+    assert len(mock_smile_p1.get_all_devices.mock_calls) == 1
@@ -2,7 +2,9 @@
 
 from unittest.mock import MagicMock
 
+from homeassistant.components.plugwise.const import COORDINATOR, DOMAIN, UPDATE_PHASES
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 
 from tests.common import MockConfigEntry
 
@@ -99,3 +101,25 @@ async def test_stretch_sensor_entities(
     state = hass.states.get("sensor.droger_52559_electricity_consumed_interval")
     assert state
     assert float(state.state) == 0.0
+
+
+async def test_anna_timing_sensor_entities(
+    hass: HomeAssistant, mock_smile_anna: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test the timing sensors show the timings of the latest update."""
+    registry = er.async_get(hass)
+    for phase in UPDATE_PHASES:
+        registry.async_update_entity(f"sensor.anna_{phase}_time", disabled_by=None)
+    await hass.config_entries.async_reload(init_integration.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][init_integration.entry_id][COORDINATOR]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    for phase in UPDATE_PHASES:
+        timer = coordinator.timers[phase]
+        state = hass.states.get(f"sensor.anna_{phase}_time")
+        assert state
+        assert state.attributes["samples"] == timer.stats["samples"] > 0
+        assert float(state.state) == timer.percentile(0.95)
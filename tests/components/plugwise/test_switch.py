@@ -10,7 +10,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import entity_registry as er
 
-from tests.common import MockConfigEntry
+from tests.common import MockConfigEntry, async_capture_events
 
 
 async def test_adam_climate_switch_entities(
@@ -44,6 +44,8 @@ async def test_adam_climate_switch_negative_testing(
     mock_smile_adam.set_switch_state.assert_called_with(
         "78d1126fc4c743db81b61c20e88342a7", None, "relay", "off"
     )
+    state = hass.states.get("switch.cv_pomp_relay")
+    assert state.state == "on"
 
     with pytest.raises(HomeAssistantError):
         await hass.services.async_call(
@@ -127,6 +129,8 @@ async def test_stretch_switch_changes(
     mock_stretch.set_switch_state.assert_called_with(
         "e1c884e7dede431dadee09506ec4f859", None, "relay", "off"
     )
+    state = hass.states.get("switch.koelkast_92c4a_relay")
+    assert state.state == "off"
 
     await hass.services.async_call(
         "switch",
@@ -151,6 +155,46 @@ async def test_stretch_switch_changes(
     )
 
 
+async def test_stretch_set_switches_service(
+    hass: HomeAssistant, mock_stretch: MagicMock, init_integration: MockConfigEntry
+) -> None:
+    """Test switching several relays, members of a selected group are skipped."""
+    events = async_capture_events(hass, "plugwise_set_switches_result")
+    updates = len(mock_stretch.async_update.mock_calls)
+
+    await hass.services.async_call(
+        DOMAIN,
+        "set_switches",
+        {
+            "entity_id": [
+                "switch.schakel_relay",
+                "switch.droger_52559_relay",
+                "switch.koelkast_92c4a_relay",
+            ],
+            "state": False,
+        },
+        blocking=True,
+    )
+
+    assert mock_stretch.set_switch_state.call_count == 2
+    mock_stretch.set_switch_state.assert_called_with(
+        "e1c884e7dede431dadee09506ec4f859", None, "relay", "off"
+    )
+    assert len(mock_stretch.async_update.mock_calls) == updates + 1
+    results = events[0].data["results"]
+    assert set(results) == {
+        "switch.schakel_relay",
+        "switch.droger_52559_relay",
+        "switch.koelkast_92c4a_relay",
+    }
+    assert results["switch.droger_52559_relay"] == {
+        "success": True,
+        "via": "switch.schakel_relay",
+    }
+    assert "via" not in results["switch.koelkast_92c4a_relay"]
+    assert hass.states.get("switch.koelkast_92c4a_relay").state == "off"
+
+
 async def test_unique_id_migration_plug_relay(
     hass: HomeAssistant, mock_smile_adam: MagicMock, mock_config_entry: MockConfigEntry
 ) -> None: